@@ -0,0 +1,89 @@
+import queue
+import threading
+
+class Background_simulation:
+    """
+    Runs a batch simulation in a worker thread and posts its progress to a queue,
+    so a Tk window can poll it with after() while staying responsive
+    """
+    def __init__(self, teams, brackets, chunk_size=20000, seed=None):
+        """
+        Prepare the simulation of the current teams, without starting it
+
+        Args:
+            teams (list): The Team objects entering every bracket, their media is read now
+            brackets (int): The number of tournaments to simulate
+            chunk_size (int): Tournaments simulated between two progress messages
+            seed (int, optional): Seed of the random stream
+        """
+        self.names = [team.name for team in teams]
+        self.medias = [team.media for team in teams]
+        self.brackets = brackets
+        self.chunk_size = chunk_size
+        self.seed = seed
+        self.messages = queue.Queue()
+        self.cancelled = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        """
+        Start the worker thread
+        """
+        self.thread.start()
+
+    def cancel(self):
+        """
+        Ask the worker to stop after the chunk it is simulating
+        """
+        self.cancelled.set()
+
+    def is_running(self):
+        """
+        Returns whether the worker thread is still simulating
+
+        Returns:
+            bool: True while the thread is alive
+        """
+        return self.thread.is_alive()
+
+    def run(self):
+        """
+        Simulate the tournaments chunk by chunk, posting messages to self.messages:
+        ('progress', done, odds) after every chunk, then ('done', done, odds),
+        ('cancelled', done, odds) or ('error', message, None)
+        where odds is a list of (name, title probability) sorted from the favorite
+        """
+        try:
+            # Imported in the worker so the window opens without loading NumPy
+            import numpy as np
+            from batch_tournament import Batch_tournament
+
+            engine = Batch_tournament(self.medias, chunk_size=self.chunk_size)
+            rng = np.random.default_rng(self.seed)
+            result = engine.empty_result()
+            while result['brackets'] < self.brackets:
+                if self.cancelled.is_set():
+                    self.messages.put(('cancelled', result['brackets'], self.odds(result)))
+                    return
+                # The engine lowers the chunk size of large fields to bound the memory used
+                count = min(engine.chunk_size, self.brackets - result['brackets'])
+                engine.count(engine.simulate_chunk(count, rng), result)
+                self.messages.put(('progress', result['brackets'], self.odds(result)))
+            self.messages.put(('done', result['brackets'], self.odds(result)))
+        except Exception as error:
+            self.messages.put(('error', str(error), None))
+
+    def odds(self, result):
+        """
+        Converts the title counts of an aggregate into probabilities
+
+        Args:
+            result (dict): The aggregate of Batch_tournament
+
+        Returns:
+            list: (name, probability) pairs, highest probability first
+        """
+        if not result['brackets']:
+            return []
+        probabilities = (result['titles'] / result['brackets']).tolist()
+        return sorted(zip(self.names, probabilities), key=lambda pair: pair[1], reverse=True)
@@ -0,0 +1,232 @@
+import numpy as np
+from tournament import seed_order
+
+def play_matches(team1, team2, rating1, rating2, rng, winner_bonus, loser_bonus=0.0, bye=None, probability=None):
+    """
+    Play a set of matches at once, with the win model and media drift of Tournament.play
+
+    Parameters:
+    team1, team2 (numpy.ndarray): The ids of the teams of every match
+    rating1, rating2 (numpy.ndarray): Their media, same shape as the ids
+    rng (numpy.random.Generator): The random stream used for the draws
+    winner_bonus (float): Media added to the winner of every match
+    loser_bonus (float): Media added to the loser of every match
+    bye (int, optional): The id of a bye, when some of the matches can have one; the real
+    team goes through without playing and nobody's media changes
+    probability (numpy.ndarray, optional): The chance of team1 winning used for the draw
+    instead of the one given by the ratings, for tilted draws
+
+    Returns:
+    tuple: The winners, the losers and their media after the matches
+    """
+    total = rating1 + rating2
+    if probability is None:
+        # Same rule as random.choices with weights: team1 wins when the draw falls under its media
+        second = rng.random(total.shape) * total >= rating1
+    else:
+        second = rng.random(total.shape) >= probability
+    if bye is not None:
+        played = (team1 != bye) & (team2 != bye)
+        second = np.where(played, second, team1 == bye)
+        winner_bonus, loser_bonus = played * winner_bonus, played * loser_bonus
+    winners = np.where(second, team2, team1)
+    losers = np.where(second, team1, team2)
+    winner_ratings = np.where(second, rating2, rating1) + winner_bonus
+    loser_ratings = np.where(second, rating1, rating2) + loser_bonus
+    return winners, losers, winner_ratings, loser_ratings
+
+class Batch_tournament:
+    """
+    Simulates many single-elimination brackets at once on NumPy arrays,
+    using the same win model and media drift as Tournament.play
+    """
+    # Largest number of bracket places simulated together, about 32 MB per (count, places) array
+    CHUNK_PLACES = 1 << 22
+
+    def __init__(self, medias, order=None, shuffle=True, chunk_size=65536, winner_bonus=0.7, loser_bonus=0.5, seeding='media'):
+        """
+        Initialize the batch engine with the ratings of the field
+
+        When the number of teams is not a power of two, the field is filled with byes
+        that go to the teams with the highest media, as in Tournament.seed_byes
+
+        Parameters:
+        medias (sequence): The media rating of every team, indexed by team id
+        order (sequence, optional): Team ids in bracket order with -1 for a bye, used when shuffle is False
+        shuffle (bool): Whether every simulated bracket redraws the order, as start_tournament does
+        chunk_size (int): Number of brackets simulated together, lowered for large fields
+        so a chunk never holds more than CHUNK_PLACES places
+        winner_bonus (float): Media added to the winner of every match
+        loser_bonus (float): Media added to the loser of every match
+        seeding (str): The policy of Tournament.seed: 'media', 'random' or 'ranked';
+        a ranked bracket is the same every time, so it is never shuffled
+        """
+        if seeding not in ('media', 'random', 'ranked'):
+            raise ValueError(f"Unknown seeding {seeding!r}, use 'media', 'random' or 'ranked'.")
+        self.medias = np.asarray(medias, dtype=np.float64)
+        n_teams = len(self.medias)
+        if n_teams < 2:
+            raise ValueError(f'A bracket needs at least 2 teams, got {n_teams}.')
+        # Byes use the id right after the last team, whose media is always 0
+        self.bye = n_teams
+        size = 1 << (n_teams - 1).bit_length()
+        ranking = np.argsort(-self.medias, kind='stable')
+        self.holders = ranking[:size - n_teams]
+        self.open = np.sort(ranking[size - n_teams:])
+
+        if order is None and seeding == 'ranked':
+            seeds = np.array(seed_order(n_teams))
+            order = np.where(seeds < n_teams, ranking[np.minimum(seeds, n_teams - 1)], -1)
+            shuffle = False
+        if order is None:
+            order = np.column_stack([self.holders, np.full(len(self.holders), -1)]).ravel()
+            order = np.concatenate([order, self.open])
+        order = np.asarray(order, dtype=np.int64)
+        if len(order) != size:
+            raise ValueError(f'A bracket of {n_teams} teams needs {size} places, got {len(order)}.')
+        self.order = np.where(order < 0, self.bye, order)
+        self.rounds = size.bit_length() - 1
+        self.shuffle = shuffle
+        self.seeding = seeding
+        self.chunk_size = max(1, min(chunk_size, self.CHUNK_PLACES // size))
+        self.winner_bonus = winner_bonus
+        self.loser_bonus = loser_bonus
+
+    @classmethod
+    def from_teams(cls, teams, **kwargs):
+        """
+        Build a batch engine from a list of Team objects
+
+        Parameters:
+        teams (list): A list of Team objects, their position is used as team id
+        kwargs: Any other argument accepted by Batch_tournament
+
+        Returns:
+        Batch_tournament: An engine over the current media of the teams
+        """
+        return cls([team.media for team in teams], **kwargs)
+
+    def empty_result(self):
+        """
+        Return an aggregate with no simulated brackets
+
+        Returns:
+        dict: 'brackets' count, 'titles' per team and 'rounds' reached per team and round
+        """
+        rounds = np.zeros((len(self.medias), self.rounds + 1), dtype=np.int64)
+        return {'brackets': 0, 'titles': rounds[:, -1].copy(), 'rounds': rounds}
+
+    def simulate_chunk(self, count, rng, tilt=None, weights=None):
+        """
+        Simulate a group of brackets, drawing every match of a round in one step
+
+        Ratings are kept per place and shrink with the bracket: a team alive in a
+        single-elimination bracket has won every match it played, so its rating is its
+        start media plus winner_bonus per win, and the loser bonus never matters
+
+        Parameters:
+        count (int): The number of brackets to simulate
+        rng (numpy.random.Generator): The random stream used for the draws
+        tilt (callable, optional): Called as tilt(round, team1, team2, chance) with the chance
+        team1 has of winning every match of a round, returns the chances to draw with instead
+        weights (numpy.ndarray, optional): A (count,) array multiplied in place by the
+        likelihood ratio of every bracket, true over tilted probability of its draws
+
+        Returns:
+        list: The team ids alive at the start of every round, one (count, teams) array per round,
+        the last one holding the champions
+        """
+        bracket = self.draw(count, rng) if self.shuffle else np.broadcast_to(self.order, (count, len(self.order))).copy()
+        # The bye reads media 0 from the slot after the last team
+        ratings = np.append(self.medias, 0.0)[bracket]
+        alive = [bracket]
+
+        while bracket.shape[1] > 1:
+            # A team facing a bye goes through without playing, only possible in the first round
+            bye = self.bye if len(alive) == 1 and len(self.holders) else None
+            team1, team2, rating1, rating2 = bracket[:, 0::2], bracket[:, 1::2], ratings[:, 0::2], ratings[:, 1::2]
+            probability = None
+            if tilt is not None:
+                total = rating1 + rating2
+                chance = np.divide(rating1, total, out=np.full(total.shape, 0.5), where=total > 0)
+                probability = tilt(len(alive) - 1, team1, team2, chance)
+            bracket, _, ratings, _ = play_matches(team1, team2, rating1, rating2, rng, self.winner_bonus, bye=bye, probability=probability)
+            if probability is not None and weights is not None:
+                # Matches left untilted, byes included, keep a ratio of exactly 1
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ratio = np.where(bracket == team2, (1 - chance) / (1 - probability), chance / probability)
+                weights *= np.where(probability == chance, 1.0, ratio).prod(axis=1)
+            alive.append(bracket)
+        return alive
+
+    def draw(self, count, rng):
+        """
+        Draw the bracket order of many brackets the way start_tournament does:
+        with 'media' seeding the holders of the byes are fixed and everything else is
+        shuffled, with 'random' seeding the holders are drawn as well
+
+        Parameters:
+        count (int): The number of brackets to draw
+        rng (numpy.random.Generator): The random stream used for the draws
+
+        Returns:
+        numpy.ndarray: A (count, places) array of team ids, self.bye for a bye
+        """
+        # Sorting random keys shuffles every row at once, faster than Generator.permuted
+        if self.seeding == 'random':
+            # Any team can get a bye: the first ones of every shuffled row hold them
+            teams = np.argsort(rng.random((count, len(self.medias))), axis=1)
+            holders, rest = teams[:, :len(self.holders)], teams[:, len(self.holders):]
+        else:
+            holders, rest = self.holders, self.open[np.argsort(rng.random((count, len(self.open))), axis=1)]
+        if not len(self.holders):
+            return rest
+        byes = np.broadcast_to(np.stack([holders, np.full(np.shape(holders), self.bye)], axis=-1), (count, len(self.holders), 2))
+        pairs = np.concatenate([byes, rest.reshape(count, -1, 2)], axis=1)
+        # Shuffle the pairs as well, so the byes are spread over the bracket
+        places = np.argsort(rng.random(pairs.shape[:2]), axis=1)
+        return np.take_along_axis(pairs, places[:, :, None], axis=1).reshape(count, -1)
+
+    def count(self, alive, result):
+        """
+        Add the rounds reached in a simulated chunk to an aggregate
+
+        Parameters:
+        alive (list): The arrays returned by simulate_chunk
+        result (dict): The aggregate to update in place
+
+        Returns:
+        dict: The updated aggregate
+        """
+        n_teams = len(self.medias)
+        for stage, teams in enumerate(alive):
+            result['rounds'][:, stage] += np.bincount(teams.ravel(), minlength=n_teams + 1)[:n_teams]
+        result['titles'] = result['rounds'][:, -1].copy()
+        result['brackets'] += len(alive[0])
+        return result
+
+    def run(self, brackets, seed=None, replays=None):
+        """
+        Simulate a number of brackets and aggregate the results
+
+        Parameters:
+        brackets (int): The number of brackets to simulate
+        seed (int or numpy.random.Generator, optional): Seed or stream for the draws
+        replays (Replay_store, optional): A store where every simulated bracket is saved
+
+        Returns:
+        dict: 'brackets' count, 'titles' won per team and 'rounds' reached per team,
+        where rounds[team, r] counts the brackets in which the team played round r
+        and the last column counts titles
+        """
+        rng = np.random.default_rng(seed)
+        result = self.empty_result()
+        done = 0
+        while done < brackets:
+            count = min(self.chunk_size, brackets - done)
+            alive = self.simulate_chunk(count, rng)
+            if replays is not None:
+                replays.append(alive)
+            self.count(alive, result)
+            done += count
+        return result
@@ -0,0 +1,260 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+from tournament_manager import Tournament_manager
+
+FIELD_SIZES = [4, 32, 1024, 65536]
+BATCH_SIZES = [1, 1000, 1000000]
+QUICK_FIELD_SIZES = [4, 32, 1024]
+QUICK_BATCH_SIZES = [1, 1000, 100000]
+# Brackets of a large field, where the memory of a chunk matters more than the per-round overhead
+LARGE_FIELD = 4096
+LARGE_BATCH_SIZES = [1000, 20000]
+QUICK_LARGE_BATCH_SIZES = [1000]
+
+def team_names(count):
+    """
+    Builds valid, distinct team names, as create_team only accepts letters and spaces
+
+    Args:
+        count (int): The number of names
+
+    Returns:
+        list: The names
+    """
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    names = []
+    for number in range(count):
+        name = ''
+        number += 26 * 27
+        while number:
+            number, digit = divmod(number, 26)
+            name += letters[digit]
+        names.append(name)
+    return names
+
+def filled_manager(size):
+    """
+    Builds a manager with a field of random medias
+
+    Args:
+        size (int): The number of teams
+
+    Returns:
+        Tournament_manager: The manager with its teams
+    """
+    manager = Tournament_manager()
+    manager.create_teams((name, random.uniform(50, 100)) for name in team_names(size))
+    return manager
+
+def measure(run, operations, repeat, min_time=0.05):
+    """
+    Times a benchmark, keeping the best of several runs
+
+    Args:
+        run (function): The code to time, called with no arguments
+        operations (int): The number of operations done by one call of run
+        repeat (int): The number of timed runs
+        min_time (float): Runs stop early once this much time was spent and at least one run was done
+
+    Returns:
+        dict: 'seconds' of the best run, 'per_op' latency in seconds and 'ops_per_sec' throughput
+    """
+    best = float('inf')
+    spent = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+        if spent > min_time * repeat:
+            break
+    return {'seconds': best, 'per_op': best / operations, 'ops_per_sec': operations / best if best else float('inf')}
+
+def bench_engine(sizes, repeat):
+    """
+    Benchmarks the single-tournament hot paths of Tournament and Tournament_manager
+
+    Args:
+        sizes (list): The field sizes to measure
+        repeat (int): The number of timed runs of every benchmark
+
+    Returns:
+        dict: The results, keyed by benchmark name and field size
+    """
+    results = {}
+    for size in sizes:
+        manager = filled_manager(size)
+        names = [team.name for team in manager.teams]
+        teams = manager.teams
+
+        def play():
+            for i in range(0, size - 1, 2):
+                manager.play(teams[i], teams[i + 1])
+
+        def advance():
+            bracket = manager.start_tournament()
+            while len(bracket) > 1:
+                bracket = manager.advance(bracket)
+
+        def create():
+            Tournament_manager().create_teams((name, 50) for name in names)
+
+        def search():
+            for name in names:
+                manager.search_team(name)
+
+        results[f'play[{size}]'] = measure(play, size // 2, repeat)
+        results[f'advance[{size}]'] = measure(advance, size - 1, repeat)
+        results[f'create_team[{size}]'] = measure(create, size, repeat)
+        results[f'search_team[{size}]'] = measure(search, size, repeat)
+        results[f'show_teams[{size}]'] = measure(manager.show_teams, 1, repeat)
+    return results
+
+def bench_batch(batches, repeat, field=32):
+    """
+    Benchmarks the vectorized batch engine
+
+    Args:
+        batches (list): The numbers of brackets simulated per run
+        repeat (int): The number of timed runs of every benchmark
+        field (int): The number of teams of every bracket
+
+    Returns:
+        dict: The results, keyed by benchmark name and batch size, or {} without NumPy
+    """
+    try:
+        from batch_tournament import Batch_tournament
+    except ImportError:
+        return {}
+    engine = Batch_tournament([random.uniform(50, 100) for _ in range(field)])
+    return {f'batch[{field}x{brackets}]': measure(lambda: engine.run(brackets, seed=1), brackets, repeat) for brackets in batches}
+
+def start_display():
+    """
+    Makes sure Tk has a display, starting a virtual one with Xvfb when there is none
+
+    Returns:
+        subprocess.Popen: The Xvfb process to stop afterwards, None if a display was already there
+        str: A message if no display could be found or started
+    """
+    if os.environ.get('DISPLAY'):
+        return None
+    if not shutil.which('Xvfb'):
+        return 'no DISPLAY and Xvfb is not installed'
+    process = subprocess.Popen(['Xvfb', ':99', '-screen', '0', '1280x1024x24'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ['DISPLAY'] = ':99'
+    time.sleep(0.5)
+    return process
+
+def bench_gui(repeat, size=32):
+    """
+    Benchmarks the bracket redraw of App_view.tournament, from the draw to the champion
+
+    Args:
+        repeat (int): The number of timed runs
+        size (int): The number of teams of the bracket
+
+    Returns:
+        dict: The result, or {'gui': message} when Tk cannot open a display
+    """
+    display = start_display()
+    if isinstance(display, str):
+        return {'gui': display}
+    try:
+        import tkinter as tk
+        from interfaz import App_view
+        try:
+            app = App_view()
+        except tk.TclError as error:
+            return {'gui': str(error)}
+        app.withdraw()
+        app.tournament_manager = filled_manager(size)
+
+        def rounds():
+            app.team_data = []
+            app.tournament()
+            while app.team_data:
+                app.simulate()
+                app.update()
+            app.return_to_menu()
+
+        result = {f'gui_tournament[{size}]': measure(rounds, size.bit_length(), repeat)}
+        app.destroy()
+        return result
+    finally:
+        if display is not None:
+            display.terminate()
+
+def compare(results, baseline, threshold):
+    """
+    Compares results with a stored baseline
+
+    Args:
+        results (dict): The current results
+        baseline (dict): The results of a previous run
+        threshold (float): Allowed slowdown, 0.2 means 20% slower than the baseline
+
+    Returns:
+        list: A message for every benchmark slower than the baseline by more than the threshold
+    """
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not isinstance(result, dict) or not isinstance(before, dict):
+            continue
+        ratio = result['per_op'] / before['per_op']
+        if ratio > 1 + threshold:
+            regressions.append(f'{name}: {ratio:.2f}x slower than the baseline')
+    return regressions
+
+def main(argv=None):
+    """
+    Runs the benchmarks, prints the results as JSON and checks them against a baseline
+
+    Args:
+        argv (list, optional): The arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: 1 if a benchmark regressed, 0 otherwise
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the tournament engine hot paths.')
+    parser.add_argument('--quick', action='store_true', help='smaller field and batch sizes')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark, the best one is kept')
+    parser.add_argument('--no-gui', action='store_true', help='skip the Tk canvas benchmark')
+    parser.add_argument('--output', help='file where the results are written as JSON')
+    parser.add_argument('--baseline', help='JSON results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown against the baseline')
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+    random.seed(0)
+    results = bench_engine(QUICK_FIELD_SIZES if args.quick else FIELD_SIZES, args.repeat)
+    results.update(bench_batch(QUICK_BATCH_SIZES if args.quick else BATCH_SIZES, args.repeat))
+    results.update(bench_batch(QUICK_LARGE_BATCH_SIZES if args.quick else LARGE_BATCH_SIZES, args.repeat, field=LARGE_FIELD))
+    if not args.no_gui:
+        results.update(bench_gui(args.repeat))
+    report = {'python': platform.python_version(), 'machine': platform.machine(), 'results': results}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text)
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(results, json.load(baseline)['results'], args.threshold)
+        for message in regressions:
+            print(message, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
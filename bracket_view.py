@@ -0,0 +1,321 @@
+import tkinter as tk
+
+def round_name(size):
+    """
+    Returns the name of a round from the number of places in it
+
+    Args:
+        size (int): The number of places of the round
+
+    Returns:
+        str: The name of the round
+    """
+    names = {2: 'Final', 4: 'Semifinal', 8: 'Quarterfinal'}
+    return names.get(size, f'Round of {size}')
+
+class Bracket_layout:
+    """
+    Computes where every match of a bracket of any size goes, in world coordinates:
+    one column per round, every match centered between the two matches it comes from
+    """
+    CELL_W = 120
+    CELL_H = 36
+    COL_GAP = 40
+    ROW_H = 44
+
+    def __init__(self, places):
+        """
+        Initialize the layout of a bracket
+
+        Args:
+            places (int): The number of places of the first round, a power of two
+        """
+        self.places = places
+        self.rounds = places.bit_length() - 1
+
+    def matches(self, stage):
+        """
+        Returns the number of matches of a round
+
+        Args:
+            stage (int): The round, 0 for the first one
+
+        Returns:
+            int: The number of matches
+        """
+        return self.places >> (stage + 1)
+
+    def pitch(self, stage):
+        """
+        Returns the vertical distance between two matches of a round
+
+        Args:
+            stage (int): The round, 0 for the first one
+
+        Returns:
+            float: The distance in world units
+        """
+        return self.ROW_H * (1 << stage)
+
+    def cell(self, stage, index):
+        """
+        Returns the box of a match
+
+        Args:
+            stage (int): The round, 0 for the first one
+            index (int): The match within the round, from the top
+
+        Returns:
+            tuple: The (x1, y1, x2, y2) box in world coordinates
+        """
+        x = stage * (self.CELL_W + self.COL_GAP)
+        y = (index + 0.5) * self.pitch(stage)
+        return x, y - self.CELL_H / 2, x + self.CELL_W, y + self.CELL_H / 2
+
+    def size(self):
+        """
+        Returns the size of the whole bracket
+
+        Returns:
+            tuple: The (width, height) in world units
+        """
+        return self.rounds * (self.CELL_W + self.COL_GAP), self.places // 2 * self.ROW_H
+
+    def visible(self, x1, y1, x2, y2):
+        """
+        Returns the rounds and matches inside a viewport, without looking at the others
+
+        Args:
+            x1, y1, x2, y2 (float): The viewport in world coordinates
+
+        Returns:
+            list: A (stage, first, last) tuple per visible round, matches first to last included
+        """
+        column = self.CELL_W + self.COL_GAP
+        result = []
+        for stage in range(max(0, int(x1 // column)), min(self.rounds, int(x2 // column) + 1)):
+            pitch = self.pitch(stage)
+            first = max(0, int((y1 - self.CELL_H / 2) // pitch))
+            last = min(self.matches(stage) - 1, int((y2 + self.CELL_H / 2) // pitch))
+            if first <= last:
+                result.append((stage, first, last))
+        return result
+
+class Bracket_view(tk.Canvas):
+    """
+    Canvas showing a bracket of any size. Only the matches inside the viewport are
+    drawn, reusing a pool of canvas items; drag to pan and use the wheel to zoom.
+    Rounds whose matches would be too close on screen collapse into one summary bar
+    """
+    MIN_TEXT_PX = 22
+    MIN_PITCH_PX = 10
+
+    def __init__(self, master, places, **kwargs):
+        """
+        Initialize the view of an empty bracket
+
+        Args:
+            master (tk.Widget): The parent widget
+            places (int): The number of places of the first round, a power of two
+            kwargs: Any other option of tk.Canvas
+        """
+        kwargs.setdefault('bg', '#1f2222')
+        kwargs.setdefault('highlightthickness', 0)
+        super().__init__(master, **kwargs)
+        self.layout = Bracket_layout(places)
+        self.rounds_data = []
+        self.scale = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.pool = []
+        self.used = 0
+        self.pending = False
+        self.drag = None
+        self.bind('<ButtonPress-1>', self.on_press)
+        self.bind('<B1-Motion>', self.on_drag)
+        self.bind('<MouseWheel>', self.on_wheel)
+        self.bind('<Button-4>', lambda event: self.zoom(1.2, event.x, event.y))
+        self.bind('<Button-5>', lambda event: self.zoom(1 / 1.2, event.x, event.y))
+        self.bind('<Configure>', lambda event: self.request_redraw())
+
+    def add_round(self, teams):
+        """
+        Adds the teams alive at the start of a round and redraws
+
+        Args:
+            teams (list): Team objects in bracket order, None for a bye
+        """
+        self.rounds_data.append(teams)
+        self.request_redraw()
+
+    def fit(self):
+        """
+        Zooms out so the whole bracket fits in the view
+        """
+        width, height = self.layout.size()
+        view_width, view_height = max(self.winfo_width(), 1), max(self.winfo_height(), 1)
+        self.scale = min(view_width / width, view_height / height, 1.0)
+        self.offset_x = self.offset_y = 0.0
+        self.request_redraw()
+
+    def on_press(self, event):
+        self.drag = (event.x, event.y)
+
+    def on_drag(self, event):
+        x, y = self.drag
+        self.offset_x -= (event.x - x) / self.scale
+        self.offset_y -= (event.y - y) / self.scale
+        self.drag = (event.x, event.y)
+        self.request_redraw()
+
+    def on_wheel(self, event):
+        self.zoom(1.2 if event.delta > 0 else 1 / 1.2, event.x, event.y)
+
+    def zoom(self, factor, x, y):
+        """
+        Zooms around a point of the view, keeping it under the pointer
+
+        Args:
+            factor (float): How much to multiply the scale by
+            x, y (int): The point of the view, in pixels
+        """
+        world_x, world_y = self.offset_x + x / self.scale, self.offset_y + y / self.scale
+        self.scale = min(4.0, max(1e-4, self.scale * factor))
+        self.offset_x, self.offset_y = world_x - x / self.scale, world_y - y / self.scale
+        self.request_redraw()
+
+    def request_redraw(self):
+        """
+        Schedules a redraw once the pending events are handled, so a burst of
+        drag or wheel events only draws once
+        """
+        if not self.pending:
+            self.pending = True
+            self.after_idle(self.redraw)
+
+    def item(self):
+        """
+        Returns the next free rectangle and text of the pool, creating them when the pool is used up
+
+        Returns:
+            tuple: IDs of the rectangle and the text
+        """
+        if self.used == len(self.pool):
+            self.pool.append((self.create_rectangle(0, 0, 0, 0, width=1), self.create_text(0, 0, font=('arial', 8, 'bold'))))
+        cell = self.pool[self.used]
+        self.used += 1
+        return cell
+
+    def redraw(self):
+        """
+        Draws the visible part of the bracket, hiding every pooled item left unused
+        """
+        self.pending = False
+        self.used = 0
+        scale = self.scale
+        width, height = self.winfo_width(), self.winfo_height()
+        x1, y1 = self.offset_x, self.offset_y
+        x2, y2 = x1 + width / scale, y1 + height / scale
+
+        for stage, first, last in self.layout.visible(x1, y1, x2, y2):
+            pitch = self.layout.pitch(stage) * scale
+            if pitch < self.MIN_PITCH_PX:
+                # Level of detail: the whole round becomes a single bar with a summary
+                box_x1 = self.layout.cell(stage, 0)[0]
+                rect_id, text_id = self.item()
+                self.coords(rect_id, (box_x1 - x1) * scale, 0, (box_x1 + self.layout.CELL_W - x1) * scale, height)
+                self.itemconfigure(rect_id, fill='#156170', outline='#606061', state='normal')
+                text = f'{round_name(self.layout.places >> stage)}\n{self.layout.matches(stage)} matches'
+                show_text = self.layout.CELL_W * scale >= self.MIN_TEXT_PX * 3
+                self.coords(text_id, (box_x1 + self.layout.CELL_W / 2 - x1) * scale, height / 2)
+                self.itemconfigure(text_id, text=text, fill='white', state='normal' if show_text else 'hidden')
+                continue
+            for index in range(first, last + 1):
+                self.draw_match(stage, index, x1, y1, scale)
+
+        for rect_id, text_id in self.pool[self.used:]:
+            self.itemconfigure(rect_id, state='hidden')
+            self.itemconfigure(text_id, state='hidden')
+
+    def draw_match(self, stage, index, x1, y1, scale):
+        """
+        Draws one match with a pooled cell
+
+        Args:
+            stage (int): The round, 0 for the first one
+            index (int): The match within the round
+            x1, y1 (float): The world coordinates of the top left corner of the view
+            scale (float): Pixels per world unit
+        """
+        box = self.layout.cell(stage, index)
+        rect_id, text_id = self.item()
+        self.coords(rect_id, (box[0] - x1) * scale, (box[1] - y1) * scale, (box[2] - x1) * scale, (box[3] - y1) * scale)
+
+        fill = '#303030'
+        text = '?\nvs\n?'
+        if stage < len(self.rounds_data):
+            teams = self.rounds_data[stage]
+            team1, team2 = teams[2 * index], teams[2 * index + 1]
+            names = ['Bye' if team is None else team.name for team in (team1, team2)]
+            text = f'{names[0]}\nvs\n{names[1]}'
+            fill = '#25adc8' if stage + 1 < len(self.rounds_data) else '#1b7f93'
+        self.itemconfigure(rect_id, fill=fill, outline='#606061', state='normal')
+
+        if self.layout.CELL_H * scale >= self.MIN_TEXT_PX:
+            self.coords(text_id, ((box[0] + box[2]) / 2 - x1) * scale, ((box[1] + box[3]) / 2 - y1) * scale)
+            self.itemconfigure(text_id, text=text, fill='white', state='normal')
+        else:
+            self.itemconfigure(text_id, state='hidden')
+
+class Leaderboard_view(tk.Canvas):
+    """
+    Canvas listing the teams of a Tournament_manager by media. Only the rows in
+    view are fetched, one page at a time through Tournament_manager.top_teams
+    """
+    ROW_H = 19
+
+    def __init__(self, master, manager, **kwargs):
+        """
+        Initialize the view at the top of the ranking
+
+        Args:
+            master (tk.Widget): The parent widget
+            manager (Tournament_manager): The manager whose ranking is shown
+            kwargs: Any other option of tk.Canvas
+        """
+        kwargs.setdefault('bg', '#1f2222')
+        kwargs.setdefault('highlightthickness', 0)
+        super().__init__(master, **kwargs)
+        self.manager = manager
+        self.first = 0
+        self.rows = []
+        self.bind('<MouseWheel>', lambda event: self.scroll(-3 if event.delta > 0 else 3))
+        self.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.bind('<Button-5>', lambda event: self.scroll(3))
+        self.bind('<Configure>', lambda event: self.redraw())
+
+    def scroll(self, rows):
+        """
+        Moves the view by a number of rows
+
+        Args:
+            rows (int): Rows to move, negative to go up
+        """
+        last = max(0, len(self.manager.teams) - self.winfo_height() // self.ROW_H)
+        self.first = min(last, max(0, self.first + rows))
+        self.redraw()
+
+    def redraw(self):
+        """
+        Fetches and draws the page of the ranking in view, reusing the text items
+        """
+        count = max(1, self.winfo_height() // self.ROW_H)
+        page = self.manager.top_teams(self.first, count)
+        while len(self.rows) < len(page):
+            self.rows.append(self.create_text(10, 0, anchor='nw', fill='white', font=('Arial', 9)))
+        for row, text_id in enumerate(self.rows):
+            if row < len(page):
+                self.coords(text_id, 10, row * self.ROW_H)
+                self.itemconfigure(text_id, text=f'{self.first + row + 1}_{page[row]}', state='normal')
+            else:
+                self.itemconfigure(text_id, state='hidden')
@@ -0,0 +1,205 @@
+import numpy as np
+from batch_tournament import Batch_tournament, play_matches
+from tournament import Match_event
+
+class Double_elimination:
+    """
+    Simulates double-elimination brackets on NumPy arrays, many at once.
+    Losers of the winners bracket drop into a losers bracket, a team is out after its
+    second loss, and the grand final is played again when the losers bracket champion
+    wins it. Matches follow the win model and media drift of Tournament.play
+    """
+    def __init__(self, medias, shuffle=True, chunk_size=16384, winner_bonus=0.7, loser_bonus=0.5):
+        """
+        Initialize the engine with the ratings of the field
+
+        When the number of teams is not a power of two, the teams with the highest media
+        get byes in the first round, as in Tournament.seed_byes
+
+        Parameters:
+        medias (sequence): The media rating of every team, indexed by team id, at least 4 teams
+        shuffle (bool): Whether every simulated bracket redraws the order, as start_tournament does
+        chunk_size (int): Number of brackets simulated together, lowered for large fields
+        winner_bonus (float): Media added to the winner of every match
+        loser_bonus (float): Media added to the loser of every match
+        """
+        # The single-elimination engine draws the first round, byes included
+        self.draw = Batch_tournament(medias, shuffle=shuffle, chunk_size=chunk_size)
+        if len(self.draw.medias) < 4:
+            raise ValueError(f'A double-elimination bracket needs at least 4 teams, got {len(self.draw.medias)}.')
+        self.medias = self.draw.medias
+        self.bye = self.draw.bye
+        self.rounds = self.draw.rounds
+        # Lowered for large fields the same way as in Batch_tournament
+        self.chunk_size = self.draw.chunk_size
+        self.winner_bonus = winner_bonus
+        self.loser_bonus = loser_bonus
+
+    @classmethod
+    def from_teams(cls, teams, **kwargs):
+        """
+        Build a double-elimination engine from a list of Team objects
+
+        Parameters:
+        teams (list): A list of Team objects, their position is used as team id
+        kwargs: Any other argument accepted by Double_elimination
+
+        Returns:
+        Double_elimination: An engine over the current media of the teams
+        """
+        return cls([team.media for team in teams], **kwargs)
+
+    def stage_names(self):
+        """
+        Return the name of every stage in the order they are played
+
+        Returns:
+        list: 'W1'... for the winners bracket, 'L1'... for the losers bracket,
+        then 'GF' and 'GF reset'; the reset is only played when needed
+        """
+        names = []
+        losers = 0
+        for stage in range(1, self.rounds + 1):
+            names.append(f'W{stage}')
+            # The first losers round pairs the losers of W1, later ones drop the new losers
+            # in and, except after the winners final, thin the field among themselves
+            for _ in range(1 if stage == 1 or stage == self.rounds else 2):
+                losers += 1
+                names.append(f'L{losers}')
+        return names + ['GF', 'GF reset']
+
+    def match(self, team1, team2, rating1, rating2, rng):
+        """
+        Play a set of matches at once with play_matches, byes included
+
+        Parameters:
+        team1, team2 (numpy.ndarray): The ids of the teams of every match
+        rating1, rating2 (numpy.ndarray): Their media, same shape as the ids
+        rng (numpy.random.Generator): The random stream used for the draws
+
+        Returns:
+        tuple: The winners, the losers, their media after the matches and the chance
+        team1 had of winning every match
+        """
+        total = rating1 + rating2
+        probability = np.divide(rating1, total, out=np.zeros_like(total), where=total > 0)
+        winners, losers, winner_ratings, loser_ratings = play_matches(team1, team2, rating1, rating2, rng, self.winner_bonus, self.loser_bonus, bye=self.bye)
+        return winners, losers, winner_ratings, loser_ratings, probability
+
+    def steps(self, count, rng):
+        """
+        Simulate brackets stage by stage
+
+        Every team sits in exactly one place, of the winners or the losers bracket, and
+        its media travels with it, so memory shrinks with the field instead of holding
+        a (brackets, teams) matrix
+
+        Parameters:
+        count (int): The number of brackets to simulate
+        rng (numpy.random.Generator): The random stream used for the draws
+
+        Returns:
+        generator: For every stage played, a (name, rows, team1, team2, probability, winners) tuple
+        of arrays; rows tells which bracket every row belongs to, as the reset is only
+        played in some of them. The last stage yielded also carries the champions
+        """
+        draw = self.draw
+        bracket = draw.draw(count, rng) if draw.shuffle else np.broadcast_to(draw.order, (count, len(draw.order))).copy()
+        # The bye reads media 0 from the slot after the last team
+        ratings = np.append(self.medias, 0.0)[bracket]
+        rows = np.arange(count)[:, None]
+        names = iter(self.stage_names())
+        losers_bracket = losers_ratings = None
+
+        for stage in range(1, self.rounds + 1):
+            team1, team2 = bracket[:, 0::2], bracket[:, 1::2]
+            bracket, dropped, ratings, dropped_ratings, probability = self.match(team1, team2, ratings[:, 0::2], ratings[:, 1::2], rng)
+            yield next(names), rows, team1, team2, probability, bracket
+
+            if stage == 1:
+                team1, team2 = dropped[:, 0::2], dropped[:, 1::2]
+                rating1, rating2 = dropped_ratings[:, 0::2], dropped_ratings[:, 1::2]
+            else:
+                # New losers come in reversed, so they do not meet again who they just met
+                team1, team2 = losers_bracket, dropped[:, ::-1]
+                rating1, rating2 = losers_ratings, dropped_ratings[:, ::-1]
+            losers_bracket, _, losers_ratings, _, probability = self.match(team1, team2, rating1, rating2, rng)
+            yield next(names), rows, team1, team2, probability, losers_bracket
+
+            if 1 < stage < self.rounds:
+                team1, team2 = losers_bracket[:, 0::2], losers_bracket[:, 1::2]
+                losers_bracket, _, losers_ratings, _, probability = self.match(team1, team2, losers_ratings[:, 0::2], losers_ratings[:, 1::2], rng)
+                yield next(names), rows, team1, team2, probability, losers_bracket
+
+        team1, team2 = bracket, losers_bracket
+        champions, _, champion_ratings, runner_up_ratings, probability = self.match(team1, team2, ratings, losers_ratings, rng)
+        yield next(names), rows, team1, team2, probability, champions
+
+        # The grand final is played again where the winners bracket champion lost it
+        reset = np.nonzero(champions[:, 0] == team2[:, 0])[0]
+        if len(reset):
+            team1, team2 = team1[reset], team2[reset]
+            winners, _, _, _, probability = self.match(team1, team2, runner_up_ratings[reset], champion_ratings[reset], rng)
+            champions = champions.copy()
+            champions[reset] = winners
+            yield next(names), reset[:, None], team1, team2, probability, champions
+
+    def empty_result(self):
+        """
+        Return an aggregate with no simulated brackets
+
+        Returns:
+        dict: 'brackets' and 'resets' counts, 'titles' and 'finals' per team
+        """
+        n_teams = len(self.medias)
+        return {'brackets': 0, 'resets': 0, 'titles': np.zeros(n_teams, dtype=np.int64), 'finals': np.zeros(n_teams, dtype=np.int64)}
+
+    def run(self, brackets, seed=None):
+        """
+        Simulate a number of brackets and aggregate the results
+
+        Parameters:
+        brackets (int): The number of brackets to simulate
+        seed (int or numpy.random.Generator, optional): Seed or stream for the draws
+
+        Returns:
+        dict: 'brackets' count, 'resets' played, 'titles' won per team and 'finals'
+        reached per team
+        """
+        rng = np.random.default_rng(seed)
+        result = self.empty_result()
+        n_teams = len(self.medias)
+        done = 0
+        while done < brackets:
+            count = min(self.chunk_size, brackets - done)
+            for name, rows, team1, team2, probability, winners in self.steps(count, rng):
+                if name == 'GF':
+                    finalists = np.concatenate([team1.ravel(), team2.ravel()])
+                    result['finals'] += np.bincount(finalists, minlength=n_teams + 1)[:n_teams]
+                elif name == 'GF reset':
+                    result['resets'] += len(rows)
+                champions = winners
+            result['titles'] += np.bincount(champions.ravel(), minlength=n_teams + 1)[:n_teams]
+            result['brackets'] += count
+            done += count
+        return result
+
+    def play_events(self, number=0, seed=None):
+        """
+        Simulate one bracket, yielding every match as it is played
+
+        Parameters:
+        number (int): The number of the tournament, copied into every event
+        seed (int or numpy.random.Generator, optional): Seed or stream for the draws
+
+        Returns:
+        generator: A Match_event per match, round being the index of the stage in
+        stage_names; byes are not matches and are skipped
+        """
+        rng = np.random.default_rng(seed)
+        for stage, (name, rows, team1, team2, probability, winners) in enumerate(self.steps(1, rng)):
+            for slot in range(team1.shape[1]):
+                first, second = int(team1[0, slot]), int(team2[0, slot])
+                if first == self.bye or second == self.bye:
+                    continue
+                yield Match_event(number, stage, slot, first, second, float(probability[0, slot]), int(winners[0, slot]))
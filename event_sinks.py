@@ -0,0 +1,134 @@
+import csv
+import json
+import struct
+from tournament import Match_event
+
+class Event_sink:
+    """
+    Base class of the match event sinks: events are buffered and written to the
+    file in batches, so memory only depends on the batch size
+    """
+    mode = 'w'
+
+    def __init__(self, path, batch_size=10000):
+        """
+        Open the output file
+
+        Args:
+            path (str): The path of the file to write
+            batch_size (int): Number of events kept in memory before they are written
+        """
+        self.file = open(path, self.mode, **({} if 'b' in self.mode else {'newline': ''}))
+        self.batch_size = batch_size
+        self.buffer = []
+        self.count = 0
+
+    def write(self, event):
+        """
+        Add an event to the sink
+
+        Args:
+            event (Match_event): The match to write
+        """
+        self.buffer.append(event)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def write_all(self, events):
+        """
+        Write every event of an iterable, such as Tournament_manager.simulate_events
+
+        Args:
+            events (iterable): The matches to write
+
+        Returns:
+            int: The number of events written so far by the sink
+        """
+        for event in events:
+            self.write(event)
+        self.flush()
+        return self.count
+
+    def flush(self):
+        """
+        Write the buffered events to the file
+        """
+        if self.buffer:
+            self.write_batch(self.buffer)
+            self.count += len(self.buffer)
+            self.buffer = []
+        self.file.flush()
+
+    def write_batch(self, events):
+        """
+        Write a batch of events, implemented by every format
+
+        Args:
+            events (list): The buffered matches
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Write what is left in the buffer and close the file
+        """
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Jsonl_sink(Event_sink):
+    """
+    Writes one JSON object per match and line
+    """
+    def write_batch(self, events):
+        self.file.write(''.join(json.dumps(event._asdict()) + '\n' for event in events))
+
+class Csv_sink(Event_sink):
+    """
+    Writes one CSV row per match, after a header with the field names
+    """
+    def __init__(self, path, batch_size=10000):
+        super().__init__(path, batch_size)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(Match_event._fields)
+
+    def write_batch(self, events):
+        self.writer.writerows(events)
+
+class Binary_sink(Event_sink):
+    """
+    Writes every match as a fixed 26-byte little-endian record:
+    tournament (uint32), round (uint16), slot (uint32), team1, team2 (int32),
+    probability (float32) and winner (int32)
+    """
+    mode = 'wb'
+    record = struct.Struct('<IHIiifi')
+
+    def write_batch(self, events):
+        pack = self.record.pack
+        self.file.write(b''.join(pack(*event) for event in events))
+
+    @classmethod
+    def read(cls, path, batch_size=10000):
+        """
+        Read back the events of a binary file, one batch of records at a time
+
+        Args:
+            path (str): The path of the file written by a Binary_sink
+            batch_size (int): Number of records read from the file at once
+
+        Returns:
+            generator: The Match_event of every record
+        """
+        with open(path, 'rb') as file:
+            while True:
+                data = file.read(cls.record.size * batch_size)
+                if not data:
+                    return
+                for fields in cls.record.iter_unpack(data):
+                    yield Match_event(*fields)
@@ -0,0 +1,131 @@
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+class Instrumentation:
+    """
+    Collects counters and timers from the simulation loop. It is attached by setting
+    the instrumentation attribute of a Tournament or Tournament_manager; while that
+    attribute is None every hook is a single comparison
+    """
+    def __init__(self, memory=False):
+        """
+        Initialize empty counters and timers
+
+        Args:
+            memory (bool): Whether to trace the peak memory with tracemalloc while started
+        """
+        self.memory = memory
+        self.counters = {'matches': 0, 'rng_calls': 0, 'media_updates': 0, 'rounds': 0, 'tournaments': 0}
+        self.timers = {}
+        self.peak_memory = None
+
+    def count(self, name, amount=1):
+        """
+        Add to a counter
+
+        Args:
+            name (str): The name of the counter
+            amount (int): How much to add
+        """
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def match(self):
+        """
+        Record a match: one random draw and the media updates of both teams
+        """
+        counters = self.counters
+        counters['matches'] += 1
+        counters['rng_calls'] += 1
+        counters['media_updates'] += 2
+
+    def clock(self):
+        """
+        Return the current time, to be passed back to add_time
+
+        Returns:
+            float: A perf_counter reading
+        """
+        return time.perf_counter()
+
+    def add_time(self, name, start):
+        """
+        Add the time elapsed since start to a timer
+
+        Args:
+            name (str): The name of the timer, such as 'round[32]'
+            start (float): The value returned by clock when the timed code started
+        """
+        elapsed = time.perf_counter() - start
+        calls, seconds = self.timers.get(name, (0, 0.0))
+        self.timers[name] = (calls + 1, seconds + elapsed)
+
+    def round(self, size, start):
+        """
+        Record a round of a bracket
+
+        Args:
+            size (int): The number of places of the round
+            start (float): The value returned by clock when the round started
+        """
+        self.counters['rounds'] += 1
+        self.add_time(f'round[{size}]', start)
+
+    def start(self):
+        """
+        Start tracing memory if it was asked for
+        """
+        if self.memory:
+            tracemalloc.start()
+
+    def stop(self):
+        """
+        Stop tracing memory and keep the peak
+        """
+        if self.memory and tracemalloc.is_tracing():
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def report(self):
+        """
+        Return everything collected so far
+
+        Returns:
+            dict: 'counters', 'timers' as name -> {'calls', 'seconds'} and 'peak_memory' in bytes
+        """
+        timers = {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in self.timers.items()}
+        return {'counters': dict(self.counters), 'timers': timers, 'peak_memory': self.peak_memory}
+
+@contextmanager
+def profile(path, sort='cumulative', limit=50):
+    """
+    Run the code of a with block under cProfile and write a text report
+
+    Args:
+        path (str): The file where the report is written
+        sort (str): The pstats sort key
+        limit (int): The number of functions in the report
+
+    Returns:
+        generator: The context manager, yielding the cProfile.Profile in use
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats(sort).print_stats(limit)
+        with open(path, 'w') as report:
+            report.write(text.getvalue())
@@ -1,6 +1,9 @@
 import tkinter as tk
 from tkinter import ttk
 import random
+import time
+from background_simulation import Background_simulation
+from bracket_view import Bracket_view, Leaderboard_view, round_name
 from tournament_manager import Tournament_manager
 
 class App_view(tk.Tk):
@@ -8,6 +11,10 @@ class App_view(tk.Tk):
     Main application window for the Tournament Simulator
     Handles the UI elements and interactions for managing the tournament
     """
+    # Time between two ticks of the background animation and the part of it the tick may use
+    FRAME_MS = 50
+    FRAME_BUDGET_MS = 10
+
     def __init__(self):
         """Initialize the application window, background effect, and the slide menu"""
         super().__init__()
@@ -16,7 +23,13 @@ class App_view(tk.Tk):
         self.draw_frame_form = None
         self.draw_frame_rank = None
         self.team_data = []
+        self.particles = []
+        self.particle_pool = []
+        self.scene = None
+        self.batch = None
+        self.batch_label = None
         self.config_window()
+        self.configure_styles()
         self.bg_efect(15)
         self.slide_menu()
     
@@ -31,42 +44,48 @@ class App_view(tk.Tk):
 
     def create_point(self, x, y, size):
         """
-        Creates a point on the canvas and initiates its shrinking process
+        Shows a point on the canvas, reusing a hidden oval of the pool when there is one
         
         Args:
             x (int): The x-coordinate for the point
             y (int): The y-coordinate for the point
             size (int): The initial size of the point
         """
-        point = self.bg.create_oval(x, y, x + size, y + size,fill='white', outline='white')
-        self.shrink_point(point, x, y, size)
+        if self.particle_pool:
+            point = self.particle_pool.pop()
+            self.bg.coords(point, x, y, x + size, y + size)
+            self.bg.itemconfigure(point, state='normal')
+        else:
+            point = self.bg.create_oval(x, y, x + size, y + size, fill='white', outline='white')
+        self.particles.append([point, x, y, size])
 
 
-    def shrink_point(self, point, x, y, size):
+    def shrink_points(self):
         """
-        Recursively shrinks a point on the canvas until it disappears
-        
-        Args:
-            point (int): The canvas object ID of the point
-            x (int): The x-coordinate of the point
-            y (int): The y-coordinate of the point
-            size (int): The current size of the point
+        Shrinks every live point by one step, hiding the ones that disappear and
+        returning them to the pool
         """
-        if size > 0:
-            size -= 1
-            self.bg.coords(point, x, y, x + size, y + size)
-            self.after(50,self.shrink_point,point,x,y,size)
-        else:
-            self.bg.delete(point)        
+        alive = []
+        for particle in self.particles:
+            point, x, y, size = particle
+            if size > 1:
+                particle[3] = size - 1
+                self.bg.coords(point, x, y, x + size - 1, y + size - 1)
+                alive.append(particle)
+            else:
+                self.bg.itemconfigure(point, state='hidden')
+                self.particle_pool.append(point)
+        self.particles = alive
 
 
     def bg_efect(self,count):
         """
         
         Creates a background effect by randomly generating points on the canvas
+        A single animation tick updates every point, instead of one timer per point
         
         Args:
-            count (int): The number of points to generate
+            count (int): The number of points generated in every wave, kept in self.particle_count
         """
 
         # Initialize canvas if not already done 
@@ -74,21 +93,51 @@ class App_view(tk.Tk):
             bg = tk.Canvas(self, bg='black', width=1000, height=650)
             bg.pack()
             self.bg = bg
-            
+        
+        self.particle_count = count
+        self.next_wave = 0.0
+        self.after(self.FRAME_MS, self.animate)
+
+
+    def animate(self):
+        """
+        Animation tick: shrinks the live points and, when it is time and the frame is
+        still within its time budget, generates a new wave of points
+        """
+        start = time.perf_counter()
+        self.shrink_points()
+        
         # Get window dimensions
         w_width = self.winfo_width()
         w_height = self.winfo_height()
         
-        # Generate points if window dimensions are valid
-        if w_width > 1 and w_height > 1:
-            for i in range(count):
+        # Generate points if window dimensions are valid and the frame has time left
+        now = start * 1000
+        spent = (time.perf_counter() - start) * 1000
+        if now >= self.next_wave and spent < self.FRAME_BUDGET_MS and w_width > 1 and w_height > 1:
+            for i in range(self.particle_count):
                 x = random.randint(0, w_width)
                 y = random.randint(0, w_height)
                 size = random.randint(4, 9)
                 self.create_point(x, y, size)
+            self.next_wave = now + random.randint(100, 300)
         
-        # Schedule the next effect
-        self.after(random.randint(100, 300), self.bg_efect, count)
+        # Schedule the next tick, keeping a fixed rate
+        spent = (time.perf_counter() - start) * 1000
+        self.after(max(1, int(self.FRAME_MS - spent)), self.animate)
+
+
+    def configure_styles(self):
+        """
+        Configures the button style once, every button created afterwards uses it
+        """
+        style = ttk.Style()
+        style.theme_use('default')
+        style.configure('TButton', font=('Arial', 12, 'bold'))
+        style.map('TButton',background=[('active', '#25adc8'), ('!disabled', '#1ad0f4')],
+                            foreground=[('active','#fdfefe'),('!disabled','black')],
+                            relief=[('pressed','groove'),('!pressed', 'ridge')]
+                            )
 
 
     def buttons(self, x, y, text, command):  
@@ -104,16 +153,7 @@ class App_view(tk.Tk):
         Returns:
             ttk.Button: The created button
         """
-        # Configure the button style    
-        style = ttk.Style()
-        style.theme_use('default')
-        style.configure('TButton', font=('Arial', 12, 'bold'))
-        style.map('TButton',background=[('active', '#25adc8'), ('!disabled', '#1ad0f4')],
-                            foreground=[('active','#fdfefe'),('!disabled','black')],
-                            relief=[('pressed','groove'),('!pressed', 'ridge')]
-                            )
-        
-        # Create and place the button
+        # Create and place the button, the style was configured once in configure_styles
         btn = ttk.Button(self, text=text, command=command, style='TButton', width=12)
         self.bg.create_window(x, y, window=btn)
         return btn
@@ -126,7 +166,8 @@ class App_view(tk.Tk):
         self.buttons(100,200,'Show Teams', self.list_rank)
         self.buttons(100,250,'Search Team', self.form_search_team)
         self.buttons(100,300,'Generate Tournament', self.tournament)
-        self.buttons(100,350,'Exit', self.exits)
+        self.buttons(100,350,'Simulate N', self.form_batch_simulation)
+        self.buttons(100,400,'Exit', self.exits)
 
     def label(self, frame, text, row, column, padx=0, pady=0, columnspan =1, fg='white', bg='black', fontsize=9):
         """
@@ -247,6 +288,13 @@ class App_view(tk.Tk):
         
         frame = self.bg.create_window(350, 143, window=self.draw_frame_rank, anchor='s')
         
+        # Large fields get a scrollable leaderboard that only formats the rows in view
+        if len(self.tournament_manager.teams) > 32:
+            view = Leaderboard_view(self.draw_frame_rank, self.tournament_manager, width=320, height=475)
+            view.grid(row=0, column=0)
+            self.bg.coords(frame, 450, 600)
+            return
+        
         teams = self.tournament_manager.show_teams()
         self.show_teams_list(teams, frame)
 
@@ -295,6 +343,86 @@ class App_view(tk.Tk):
         btn.grid(row=2, column=0, columnspan=2, pady=2)
 
 
+    def form_batch_simulation(self):
+        """
+        Displays a form to simulate many tournaments in the background
+
+        The simulation runs in a worker thread, the window keeps responding and the form
+        shows the progress and the title odds so far until it finishes or is cancelled
+        """
+        self.frame_for_from(270, 10)
+        self.label(self.draw_frame_form, "Tournaments to simulate:", 0, 0, 5, 5, columnspan=2)
+        count = self.entry(self.draw_frame_form, width=20, row=1, column=0, padx=5, pady=5)
+        count.grid(columnspan=2)
+        
+        # Buttons to start and cancel the simulation
+        start = tk.Button(self.draw_frame_form, text='Start', bg='gray', font=('Arial', 8),width=10, command=lambda: self.start_batch(count.get()))
+        start.grid(row=2, column=0, pady=2)
+        cancel = tk.Button(self.draw_frame_form, text='Cancel', bg='gray', font=('Arial', 8),width=10, command=self.cancel_batch)
+        cancel.grid(row=2, column=1, pady=2)
+        self.batch_label = self.label(self.draw_frame_form, '', row=3, column=0, columnspan=2)
+
+
+    def start_batch(self, count):
+        """
+        Starts a background simulation of the current teams and begins polling its progress
+
+        Args:
+            count (str): The number of tournaments typed in the form
+        """
+        try:
+            count = int(count)
+        except ValueError:
+            count = 0
+        if count < 1:
+            self.batch_label.config(text=f'{count} is not a valid number of tournaments.', fg='red')
+            return
+        if len(self.tournament_manager.teams) < 2:
+            self.batch_label.config(text='You need at least 2 teams to create the tournament.', fg='red')
+            return
+        
+        # Only one simulation at a time, a new one replaces the previous one
+        self.cancel_batch()
+        self.batch = Background_simulation(self.tournament_manager.teams, count)
+        self.batch.start()
+        self.batch_label.config(text='Starting...', fg='white')
+        self.after(100, self.poll_batch, self.batch)
+
+
+    def cancel_batch(self):
+        """
+        Cancels the background simulation, if there is one running
+        """
+        if self.batch is not None and self.batch.is_running():
+            self.batch.cancel()
+
+
+    def poll_batch(self, batch):
+        """
+        Reads the messages posted by a background simulation and shows the latest one,
+        polling again until the simulation ends
+
+        Args:
+            batch (Background_simulation): The simulation to follow
+        """
+        message = None
+        while not batch.messages.empty():
+            message = batch.messages.get_nowait()
+        
+        finished = message is not None and message[0] != 'progress'
+        if message is not None and self.batch is batch and self.batch_label is not None and self.batch_label.winfo_exists():
+            kind, done, odds = message
+            if kind == 'error':
+                self.batch_label.config(text=done, fg='red')
+            else:
+                status = {'progress': 'Simulated', 'done': 'Finished', 'cancelled': 'Cancelled at'}[kind]
+                lines = [f'{status} {done} of {batch.brackets} ({100 * done // batch.brackets}%)']
+                lines += [f'{name}: {round(100 * probability, 2)}%' for name, probability in odds[:5]]
+                self.batch_label.config(text='\n'.join(lines), fg='white')
+        if not finished:
+            self.after(100, self.poll_batch, batch)
+
+
     def show_team_found(self, name):
         """
         Searches for a team by name and displays the result.
@@ -358,17 +486,18 @@ class App_view(tk.Tk):
                 return False
             else:
                 self.clear_bg()
+                self.scene = None
         return True
 
 
-    def configure_round_settings(self):
+    def configure_round_settings(self, size=None):
         rect_width = 110
         rect_height = 45
         margin_x, margin_y, spacing = 0, 0, 85
         fill, outline = '#25adc8', '#606061'
         
         round_names = {32: 'Round of 32', 16: 'Round of 16', 8: 'Quarterfinal', 4: 'Semifinal', 2: 'Final'}
-        current_round = round_names.get(len(self.team_data))
+        current_round = round_names.get(len(self.team_data) if size is None else size)
         
         if current_round == 'Round of 32':
             margin_x += 10
@@ -397,65 +526,132 @@ class App_view(tk.Tk):
         return rect_width, rect_height, margin_x, margin_y, spacing, fill, outline, current_round
 
 
-    def show_round(self, rect_width, rect_height, current_round):
-        round_rect_id, round_text_id = self.create_cell(0, 0, rect_width + 45, rect_height + 25, current_round)
-        self.bg.move(round_rect_id, 430, 50)
-        self.bg.move(round_text_id, 430, 50)
+    def build_scene(self):
+        """
+        Creates once, hidden, every item of the bracket of the current tournament: the round
+        title, the match cells of every round and the simulation button.
+        Later rounds only change the text, colors and state of their own cells
+        """
+        size = len(self.team_data)
+        if size > 32:
+            self.build_large_scene()
+            return
+        rect_width, rect_height = self.configure_round_settings(size)[:2]
+        header = self.create_cell(0, 0, rect_width + 45, rect_height + 25, '')
+        for item in header:
+            self.bg.move(item, 430, 50)
+        
+        cells = {}
+        while size >= 2:
+            rect_width, rect_height, margin_x, margin_y, spacing, fill, outline, current_round = self.configure_round_settings(size)
+            if size == 2:
+                # The final is displayed in the center position
+                cell = self.create_cell(0, 0, rect_width + 20, rect_height + 20, '', fill, outline)
+                self.move_cell(cell, margin_x, margin_y)
+                cells[size] = [cell]
+            else:
+                cells[size] = []
+                # Left half of the bracket first, then the right half, one cell per pair
+                for x in (margin_x, 890 - margin_x):
+                    for i in range(0, size // 2 - 1, 2):
+                        cell = self.create_cell(0, 0, rect_width, rect_height, '', fill, outline)
+                        self.move_cell(cell, x, margin_y + (i // 2) * spacing)
+                        cells[size].append(cell)
+            for cell in cells[size]:
+                for item in cell:
+                    self.bg.itemconfigure(item, state='hidden')
+            size //= 2
+        
+        button = self.buttons(500, 600, 'Simulate', self.simulate)
+        self.scene = {'header': header, 'cells': cells, 'button': button}
+
+
+    def build_large_scene(self):
+        """
+        Creates the items of a bracket too big for the fixed layout: the round title,
+        a zoomable Bracket_view that only draws what is in view, and the simulation button
+        """
+        header = self.create_cell(0, 0, 155, 70, '')
+        self.move_cell(header, 430, 40)
+        view = Bracket_view(self.bg, len(self.team_data), width=980, height=455)
+        self.bg.create_window(10, 120, window=view, anchor='nw')
+        button = self.buttons(500, 600, 'Simulate', self.simulate)
+        self.scene = {'header': header, 'view': view, 'button': button}
+        self.update_idletasks()
+        view.fit()
+
+
+    def move_cell(self, cell, x, y):
+        """
+        Moves the rectangle and the text of a cell together
+
+        Args:
+            cell (tuple): IDs of the rectangle and the text, as returned by create_cell
+            x, y (int): The offset of the move
+        """
+        for item in cell:
+            self.bg.move(item, x, y)
+
+
+    def show_round(self, current_round):
+        round_rect_id, round_text_id = self.scene['header']
         # If only one team remains, display the champion
         if len(self.team_data) == 1:
             self.bg.itemconfig(round_text_id, text=f'Champions: {self.team_data[0].name}', fill='black')
             self.bg.itemconfig(round_rect_id, fill='#7f8c8d')
             self.team_data = []
             return True # Indicate that a champion has been found
+        self.bg.itemconfig(round_text_id, text=current_round)
         return False
 
 
-    def create_team_cells(self, teams_left, teams_right, rect_width, rect_height, fill, outline, margin_x, margin_y, spacing):
-        for i in range(0, len(teams_left) - 1, 2):
-            text = f'{teams_left[i].name} \n     vs    \n {teams_left[i + 1].name}'
-            rect_id, text_id = self.create_cell(0, 0, rect_width, rect_height, text, fill, outline)
-            self.bg.move(rect_id, margin_x, margin_y + (i // 2) * spacing)
-            self.bg.move(text_id, margin_x, margin_y + (i // 2) * spacing)
-        
-        for i in range(0, len(teams_right) - 1, 2):
-            text = f'{teams_right[i].name} \n     vs     \n {teams_right[i + 1].name}'
-            rect_id, text_id = self.create_cell(0, 0, rect_width, rect_height, text, fill, outline)
-            self.bg.move(rect_id, 890 - margin_x, margin_y + (i // 2) * spacing)
-            self.bg.move(text_id, 890 - margin_x, margin_y + (i // 2) * spacing)
+    def team_name(self, team):
+        """
+        Returns the name to display for a place of the bracket
 
+        Args:
+            team (Team or None): The team in that place, None for a bye
 
-    def show_simulation_button(self):
-        btn_tournament = self.buttons(500, 600, 'Simulate', lambda: self.simulate())
-        if len(self.team_data) == 1:
-            btn_tournament.config(text='To Menu', command=lambda: self.return_to_menu())
+        Returns:
+            str: The name of the team, or 'Bye'
+        """
+        return 'Bye' if team is None else team.name
+
+
+    def show_team_cells(self):
+        """
+        Writes the matches of the current round into its cells and shows them
+        """
+        cells = self.scene['cells'][len(self.team_data)]
+        for index, (rect_id, text_id) in enumerate(cells):
+            team1, team2 = self.team_data[2 * index], self.team_data[2 * index + 1]
+            # The right half keeps its slightly wider spacing around 'vs'
+            vs = '     vs     ' if index >= len(cells) // 2 and len(cells) > 1 else '     vs    '
+            text = f'{self.team_name(team1)} \n{vs}\n {self.team_name(team2)}'
+            self.bg.itemconfigure(text_id, text=text, state='normal')
+            self.bg.itemconfigure(rect_id, state='normal')
 
 
     def tournament(self):
         """
         Initiates or continues the tournament and displays the tournament bracket.
+        The bracket items are created once per tournament, every round only updates its cells
         """
         if not self.initialize_tournament():
             return
+        if self.scene is None:
+            self.build_scene()
         
-        rect_width, rect_height, margin_x, margin_y, spacing, fill, outline, current_round = self.configure_round_settings()
-        if self.show_round(rect_width, rect_height, current_round):
+        current_round = round_name(len(self.team_data))
+        if self.show_round(current_round):
             # If there is a champion, change the button to return to the menu
-            self.buttons(500, 600, 'To Menu', lambda: self.return_to_menu())
+            self.scene['button'].config(text='To Menu', command=self.return_to_menu)
             return
-
-        # If it is the final, display the teams in the center position
-        if len(self.team_data) == 2:
-            text = f'{self.team_data[0].name} \n     vs    \n {self.team_data[1].name}'
-            rect_id, text_id = self.create_cell(0, 0, rect_width + 20, rect_height + 20, text, fill, outline)
-            self.bg.move(rect_id, margin_x, margin_y)
-            self.bg.move(text_id, margin_x, margin_y)
         
-        self.show_simulation_button()
-        self.create_team_cells(
-            self.team_data[:len(self.team_data)//2],
-            self.team_data[len(self.team_data)//2:],
-            rect_width, rect_height, fill, outline, margin_x, margin_y, spacing
-        )
+        if 'view' in self.scene:
+            self.scene['view'].add_round(self.team_data)
+        else:
+            self.show_team_cells()
 
 
     def create_cell(self, x1, y1, x2, y2, text, fill="#303030", outline='white', text_color='white'):
@@ -499,6 +695,10 @@ class App_view(tk.Tk):
         Clears the canvas and returns to the main menu.
         """
         self.bg.delete("all")
+        # The pooled points and the bracket were deleted with everything else
+        self.particles = []
+        self.particle_pool = []
+        self.scene = None
         self.slide_menu()
 
 
@@ -508,8 +708,6 @@ class App_view(tk.Tk):
         """
         self.quit()
 
-app = App_view()
-
-
-
-app.mainloop()
\ No newline at end of file
+if __name__ == '__main__':
+    app = App_view()
+    app.mainloop()
@@ -0,0 +1,154 @@
+import numpy as np
+from batch_tournament import play_matches
+
+class League:
+    """
+    Round-robin league over the media win model of Tournament.play: every team meets
+    every other team once per leg. Matchdays come from the circle method and all the
+    matches of a matchday are drawn in one vectorized step
+    """
+    def __init__(self, medias, names=None, winner_bonus=0.7, loser_bonus=0.5):
+        """
+        Initialize the league with the ratings of the clubs and empty standings
+
+        Args:
+            medias (sequence): The media rating of every club, indexed by club id
+            names (list, optional): The name of every club, used by table
+            winner_bonus (float): Media added to the winner of every match
+            loser_bonus (float): Media added to the loser of every match
+        """
+        self.medias = np.asarray(medias, dtype=np.float64).copy()
+        self.n_teams = len(self.medias)
+        if self.n_teams < 2:
+            raise ValueError(f'A league needs at least 2 clubs, got {self.n_teams}.')
+        self.names = names
+        self.winner_bonus = winner_bonus
+        self.loser_bonus = loser_bonus
+        # With an odd number of clubs a phantom club is added, meeting it means resting
+        self.places = self.n_teams + self.n_teams % 2
+        self.played = np.zeros(self.n_teams, dtype=np.int64)
+        self.wins = np.zeros(self.n_teams, dtype=np.int64)
+        self.losses = np.zeros(self.n_teams, dtype=np.int64)
+        self.day = 0
+
+    @classmethod
+    def from_teams(cls, teams, **kwargs):
+        """
+        Build a league from a list of Team objects
+
+        Args:
+            teams (list): A list of Team objects, their position is used as club id
+            kwargs: Any other argument accepted by League
+
+        Returns:
+            League: A league over the current media of the teams
+        """
+        return cls([team.media for team in teams], names=[team.name for team in teams], **kwargs)
+
+    def matchdays(self):
+        """
+        Returns the number of matchdays of one leg
+
+        Returns:
+            int: places - 1 matchdays
+        """
+        return self.places - 1
+
+    def matchday(self, day):
+        """
+        Returns the pairings of one matchday by the circle method: club 0 stays put and
+        the others rotate one place per matchday
+
+        Args:
+            day (int): The matchday, counted from 0 over every leg
+
+        Returns:
+            numpy.ndarray: A (matches, 2) array of club ids, rests already removed
+        """
+        rotating = self.places - 1
+        leg, day = divmod(day, rotating)
+        circle = np.concatenate([[0], 1 + (np.arange(rotating) + day) % rotating])
+        half = self.places // 2
+        pairs = np.column_stack([circle[:half], circle[::-1][:half]])
+        # Home and away swap on every other leg
+        if leg % 2:
+            pairs = pairs[:, ::-1]
+        return pairs[(pairs < self.n_teams).all(axis=1)]
+
+    def schedule(self, legs=1):
+        """
+        Returns the whole schedule as one array
+
+        Args:
+            legs (int): How many times every club meets every other club
+
+        Returns:
+            numpy.ndarray: A (matchdays, matches, 2) array of club ids
+        """
+        return np.stack([self.matchday(day) for day in range(legs * self.matchdays())])
+
+    def play_matchday(self, rng, pairs=None):
+        """
+        Play every match of the next matchday at once and update the standings
+
+        Args:
+            rng (numpy.random.Generator): The random stream used for the draws
+            pairs (numpy.ndarray, optional): The pairings, defaults to the next matchday of the schedule
+
+        Returns:
+            numpy.ndarray: The id of the winner of every match
+        """
+        if pairs is None:
+            pairs = self.matchday(self.day)
+        team1, team2 = pairs[:, 0], pairs[:, 1]
+        winners, losers, winner_medias, loser_medias = play_matches(team1, team2, self.medias[team1], self.medias[team2], rng, self.winner_bonus, self.loser_bonus)
+
+        # A club plays at most once per matchday, so the updates never collide
+        self.medias[winners] = winner_medias
+        self.medias[losers] = loser_medias
+        self.wins[winners] += 1
+        self.losses[losers] += 1
+        self.played[pairs.ravel()] += 1
+        self.day += 1
+        return winners
+
+    def run(self, legs=1, seed=None):
+        """
+        Play the rest of the season
+
+        Args:
+            legs (int): How many times every club meets every other club
+            seed (int or numpy.random.Generator, optional): Seed or stream for the draws
+
+        Returns:
+            numpy.ndarray: The club ids ordered by the final table
+        """
+        rng = np.random.default_rng(seed)
+        while self.day < legs * self.matchdays():
+            self.play_matchday(rng)
+        return self.order()
+
+    def order(self):
+        """
+        Returns the club ids ordered by wins, ties broken by media
+
+        Returns:
+            numpy.ndarray: The club ids, leader first
+        """
+        return np.lexsort((-self.medias, -self.wins))
+
+    def table(self, count=None):
+        """
+        Returns the standings
+
+        Args:
+            count (int, optional): Number of rows, all the clubs when missing
+
+        Returns:
+            list: A string per club with its name, played, wins, losses and media
+        """
+        rows = []
+        for club in self.order()[:count]:
+            name = self.names[club] if self.names else str(club)
+            rows.append(f'{name}: {self.played[club]} played, {self.wins[club]} won, {self.losses[club]} lost, media {round(float(self.medias[club]), 2)}')
+        return rows
@@ -0,0 +1,169 @@
+from collections import OrderedDict
+from tournament import Tournament
+
+class Matchup_cache:
+    """
+    Least recently used cache of match and sub-bracket probabilities over a Team_store.
+    Entries are keyed on the team ids and their media, and the cache listens to the
+    store so the entries of a team are dropped as soon as its media changes
+    """
+    def __init__(self, store, maxsize=4096):
+        """
+        Initialize an empty cache and register it as a listener of the store
+
+        Args:
+            store (Team_store): The store holding the teams
+            maxsize (int): The largest number of entries kept, the least recently used go first
+        """
+        if maxsize < 1:
+            raise ValueError(f'The cache needs room for at least 1 entry, got {maxsize}.')
+        self.store = store
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        # Keys of the entries every team appears in, to invalidate them without a scan
+        self.by_team = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        store.listeners.append(self)
+
+    def close(self):
+        """
+        Stop listening to the store and drop every entry
+        """
+        if self in self.store.listeners:
+            self.store.listeners.remove(self)
+        self.clear()
+
+    def clear(self):
+        """
+        Drop every entry, keeping the statistics
+        """
+        self.entries.clear()
+        self.by_team.clear()
+
+    def __len__(self):
+        """
+        Return the number of entries in the cache
+
+        Returns:
+            int: The number of cached probabilities
+        """
+        return len(self.entries)
+
+    def stats(self):
+        """
+        Return the statistics of the cache
+
+        Returns:
+            dict: 'hits', 'misses', 'evictions', 'invalidations', 'size' and the 'hit_rate'
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'invalidations': self.invalidations,
+                'size': len(self.entries), 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+    def media_changed(self, team_id, old_media):
+        """
+        Drop the entries of a team whose media changed, called by the store
+
+        Args:
+            team_id (int): The id of the team in the store
+            old_media (float): The media the team had before the change
+        """
+        for key in self.by_team.pop(team_id, ()):
+            if self.entries.pop(key, None) is not None:
+                self.invalidations += 1
+                self.forget(key)
+
+    def get(self, key, team_ids, compute):
+        """
+        Return a cached value, computing and storing it on a miss
+
+        Args:
+            key (tuple): The key of the entry, holding the media it depends on
+            team_ids (iterable): The ids of the teams the entry depends on
+            compute (callable): Called without arguments to compute the value on a miss
+
+        Returns:
+            The cached or computed value
+        """
+        entries = self.entries
+        if key in entries:
+            self.hits += 1
+            entries.move_to_end(key)
+            return entries[key]
+        self.misses += 1
+        value = compute()
+        entries[key] = value
+        for team_id in team_ids:
+            self.by_team.setdefault(team_id, set()).add(key)
+        if len(entries) > self.maxsize:
+            old_key, _ = entries.popitem(last=False)
+            self.evictions += 1
+            self.forget(old_key)
+        return value
+
+    def forget(self, key):
+        """
+        Remove an evicted or invalidated key from the index of its teams
+
+        Args:
+            key (tuple): The key of the removed entry
+        """
+        for team_id in key[1]:
+            keys = self.by_team.get(team_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.by_team[team_id]
+
+    def probability(self, team1, team2):
+        """
+        Return the chance of team1 beating team2 in Tournament.play
+
+        Args:
+            team1 (int): The id of the first team
+            team2 (int): The id of the second team
+
+        Returns:
+            float: The probability that team1 wins
+        """
+        medias = self.store.medias
+        # Stored once per unordered pair, the other order is the complement
+        first, second = (team1, team2) if team1 <= team2 else (team2, team1)
+        key = ('match', (first, second), (medias[first], medias[second]))
+        chance = self.get(key, key[1], lambda: medias[first] / (medias[first] + medias[second]))
+        return chance if first == team1 else 1 - chance
+
+    def bracket(self, order, drift=True, winner_bonus=None):
+        """
+        Return the chance of every team of a sub-bracket winning it, as computed by
+        Tournament.exact_odds
+
+        Args:
+            order (sequence): Team ids in bracket order, None for a bye
+            drift (bool): Whether to include the media won by the winner of every match
+            winner_bonus (float, optional): Media added to the winner of every match, by
+                default the one of Tournament; pass the winner_bonus of a manager that changed it
+
+        Returns:
+            dict: The probability of winning the sub-bracket per team id
+        """
+        if winner_bonus is None:
+            winner_bonus = Tournament.winner_bonus
+        ids = tuple(order)
+        teams = tuple(team_id for team_id in ids if team_id is not None)
+        medias = self.store.medias
+        key = ('bracket', teams, tuple(medias[team_id] for team_id in teams), ids, drift, float(winner_bonus))
+
+        def compute():
+            # Imported here so that the cache does not need NumPy for matches
+            from exact_odds import Exact_odds
+
+            position = {team_id: place for place, team_id in enumerate(teams)}
+            odds = Exact_odds([medias[team_id] for team_id in teams], drift=drift, winner_bonus=winner_bonus).bracket([-1 if team_id is None else position[team_id] for team_id in ids])
+            return dict(zip(teams, odds[:, -1].tolist()))
+
+        # A copy, so callers cannot change the cached distribution
+        return dict(self.get(key, teams, compute))
@@ -0,0 +1,104 @@
+from collections import namedtuple
+from statistics import NormalDist
+import numpy as np
+from batch_tournament import Batch_tournament
+
+# One answer: the chance that a team reaches a round, with its confidence interval
+Estimate = namedtuple('Estimate', ['team', 'round', 'estimate', 'low', 'high', 'brackets'])
+
+def wilson(successes, trials, z):
+    """
+    Returns the Wilson score interval of a proportion, which stays inside [0, 1]
+    and keeps a useful width when no success was seen yet
+
+    Args:
+        successes (numpy.ndarray): The number of brackets where every event happened
+        trials (int): The number of brackets simulated
+        z (float): The normal quantile of the confidence level
+
+    Returns:
+        tuple: The low and high ends of the intervals
+    """
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    half = z * np.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return np.maximum(center - half, 0.0), np.minimum(center + half, 1.0)
+
+class Odds_query:
+    """
+    Answers questions such as "the chance of team X winning the title, to 0.5%" by
+    simulating brackets in batches and stopping as soon as every interval is narrow enough
+    """
+    def __init__(self, engine, confidence=0.95, min_batch=1024, max_brackets=100000000):
+        """
+        Initialize the query over a batch engine
+
+        Args:
+            engine (Batch_tournament): The engine simulating the brackets
+            confidence (float): The confidence level of the intervals
+            min_batch (int): The smallest number of brackets simulated between two checks
+            max_brackets (int): The simulation stops here even if the precision was not reached
+        """
+        self.engine = engine
+        self.confidence = confidence
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.min_batch = min_batch
+        self.max_brackets = max_brackets
+
+    @classmethod
+    def from_manager(cls, manager, **kwargs):
+        """
+        Build a query over the teams registered in a Tournament_manager
+
+        Args:
+            manager (Tournament_manager): The manager whose teams enter every bracket
+            kwargs: Any other argument accepted by Odds_query
+
+        Returns:
+            Odds_query: A query over a Batch_tournament of the current teams
+        """
+        return cls(Batch_tournament.from_teams(manager.teams), **kwargs)
+
+    def ask(self, targets, precision=0.005, seed=None):
+        """
+        Estimate the chance of every target to the requested precision
+
+        After every batch the number of brackets still needed is predicted from the
+        current estimates, so easy questions stop after a few thousand brackets
+
+        Args:
+            targets (list): (team id, round) pairs, round counted from 0 for the first round;
+                None as round asks for the title
+            precision (float): The largest half-width accepted for every interval
+            seed (int or numpy.random.Generator, optional): Seed or stream for the draws
+
+        Returns:
+            list: An Estimate per target, in the same order
+        """
+        engine = self.engine
+        teams = np.array([team for team, _ in targets], dtype=np.int64)
+        rounds = np.array([engine.rounds if stage is None else stage for _, stage in targets], dtype=np.int64)
+        if len(teams) and (teams.min() < 0 or teams.max() >= len(engine.medias)):
+            raise ValueError(f'Team ids go from 0 to {len(engine.medias) - 1}.')
+        if len(rounds) and (rounds.min() < 0 or rounds.max() > engine.rounds):
+            raise ValueError(f'Rounds go from 0 to {engine.rounds}.')
+
+        rng = np.random.default_rng(seed)
+        result = engine.empty_result()
+        z = self.z
+        batch = self.min_batch
+        while True:
+            batch = min(batch, engine.chunk_size, self.max_brackets - result['brackets'])
+            engine.count(engine.simulate_chunk(batch, rng), result)
+            done = result['brackets']
+            low, high = wilson(result['rounds'][teams, rounds], done, z)
+            if done >= self.max_brackets or ((high - low) / 2 <= precision).all():
+                break
+            # Brackets the widest interval still needs, from the normal approximation
+            p = result['rounds'][teams, rounds] / done
+            needed = int((z * z * p * (1 - p) / (precision * precision)).max()) - done
+            batch = max(self.min_batch, needed)
+
+        estimates = result['rounds'][teams, rounds] / done
+        return [Estimate(int(team), int(stage), float(estimate), float(a), float(b), done) for team, stage, estimate, a, b in zip(teams, rounds, estimates, low, high)]
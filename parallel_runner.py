@@ -0,0 +1,117 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+from batch_tournament import Batch_tournament
+
+def run_shard(engine, brackets, seed_sequence):
+    """
+    Simulate one shard of brackets on its own random stream, used by the worker processes
+
+    Parameters:
+    engine (Batch_tournament): The engine to run
+    brackets (int): The number of brackets in the shard
+    seed_sequence (numpy.random.SeedSequence): The seed of the shard stream
+
+    Returns:
+    dict: The aggregate of the shard, as returned by Batch_tournament.run
+    """
+    return engine.run(brackets, np.random.default_rng(seed_sequence))
+
+def merge_results(results):
+    """
+    Add up the aggregates of several shards
+
+    Parameters:
+    results (iterable): Aggregates returned by Batch_tournament.run over the same field
+
+    Returns:
+    dict: A single aggregate with the counts of every shard, None if there are no shards
+    """
+    merged = None
+    for result in results:
+        if merged is None:
+            merged = {key: value.copy() if isinstance(value, np.ndarray) else value for key, value in result.items()}
+            continue
+        merged['brackets'] += result['brackets']
+        merged['rounds'] += result['rounds']
+    if merged is not None:
+        merged['titles'] = merged['rounds'][:, -1].copy()
+    return merged
+
+class Parallel_runner:
+    """
+    Shards batch simulations across a process pool, giving every shard its own
+    seeded stream so the merged result only depends on the master seed
+    """
+    def __init__(self, engine, workers=None, shard_size=262144):
+        """
+        Initialize the runner
+
+        Args:
+            engine (Batch_tournament): The engine every worker runs
+            workers (int, optional): Number of processes, defaults to the number of CPUs
+            shard_size (int): Brackets per shard, the unit of work handed to a worker
+        """
+        self.engine = engine
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+
+    @classmethod
+    def from_manager(cls, manager, **kwargs):
+        """
+        Build a runner over the teams registered in a Tournament_manager
+
+        Args:
+            manager (Tournament_manager): The manager whose teams enter every bracket
+            kwargs: Any other argument accepted by Parallel_runner
+
+        Returns:
+            Parallel_runner: A runner over a Batch_tournament of the current teams
+        """
+        return cls(Batch_tournament.from_teams(manager.teams), **kwargs)
+
+    def shards(self, brackets):
+        """
+        Split a number of brackets into shards
+
+        The split only depends on the shard size, never on the number of workers,
+        so every shard gets the same stream whatever the pool looks like
+
+        Args:
+            brackets (int): The total number of brackets
+
+        Returns:
+            list: The number of brackets in every shard
+        """
+        full, rest = divmod(brackets, self.shard_size)
+        return [self.shard_size] * full + ([rest] if rest else [])
+
+    def run(self, brackets, seed=None):
+        """
+        Simulate brackets across the pool and merge the aggregates
+
+        Args:
+            brackets (int): The total number of brackets to simulate
+            seed (int or numpy.random.SeedSequence, optional): Master seed, a fresh one is drawn when missing
+
+        Returns:
+            dict: The merged aggregate, as returned by Batch_tournament.run, plus the
+            'seed' entropy needed to reproduce the run
+        """
+        master = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        sizes = self.shards(brackets)
+        seeds = master.spawn(len(sizes))
+
+        if self.workers == 1 or len(sizes) <= 1:
+            results = map(run_shard, repeat(self.engine), sizes, seeds)
+            merged = merge_results(results)
+        else:
+            with ProcessPoolExecutor(min(self.workers, len(sizes))) as pool:
+                # map keeps the shard order, so the merge adds the counts in the same order every time
+                merged = merge_results(pool.map(run_shard, repeat(self.engine), sizes, seeds))
+
+        if merged is None:
+            merged = self.engine.empty_result()
+        merged['seed'] = master.entropy
+        return merged
@@ -0,0 +1,174 @@
+from bisect import bisect_left, insort
+
+class Ranking:
+    """
+    Keeps the ids of a set of teams ordered by media, highest first, updated as
+    their media changes. Keys are kept in a list of sorted buckets, so adding,
+    removing or moving a team costs a binary search plus a shift inside one bucket.
+    Media changes are only recorded when they happen and applied on the next read,
+    so a team that plays many matches between two reads moves once
+    """
+    def __init__(self, store, load=512):
+        """
+        Initialize an empty ranking and start listening to the media changes of a store
+
+        Args:
+            store (Team_store): The store holding the teams
+            load (int): Target bucket size, a bucket is split once it doubles it
+        """
+        self.store = store
+        self.load = load
+        self.buckets = []
+        self.maxes = []
+        self.keys = {}
+        self.changed = set()
+        store.listeners.append(self)
+
+    def __len__(self):
+        """
+        Return the number of ranked teams
+
+        Returns:
+            int: The number of team ids in the ranking
+        """
+        return len(self.keys)
+
+    def __iter__(self):
+        """
+        Iterate over the ranked team ids, highest media first
+
+        Returns:
+            generator: The team ids in ranking order
+        """
+        self.update()
+        for bucket in self.buckets:
+            for key in bucket:
+                yield key[1]
+
+    def add(self, team_id):
+        """
+        Rank a team
+
+        Args:
+            team_id (int): The id of the team in the store
+        """
+        # Ties on media keep the order in which the teams were created
+        key = (-self.store.medias[team_id], team_id)
+        self.keys[team_id] = key
+        self.insert(key)
+
+    def add_many(self, team_ids):
+        """
+        Rank many teams at once, sorting them in one go instead of inserting them one by one
+
+        Args:
+            team_ids (iterable): The ids of the teams in the store
+        """
+        medias = self.store.medias
+        for team_id in team_ids:
+            self.keys[team_id] = (-medias[team_id], team_id)
+        self.rebuild()
+
+    def remove(self, team_id):
+        """
+        Stop ranking a team
+
+        Args:
+            team_id (int): The id of the team in the store
+        """
+        key = self.keys.pop(team_id, None)
+        if key is not None:
+            self.delete(key)
+            self.changed.discard(team_id)
+
+    def media_changed(self, team_id, old_media):
+        """
+        Record that the media of a team changed, called by the store
+
+        Args:
+            team_id (int): The id of the team in the store
+            old_media (float): The media the team had before the change
+        """
+        if team_id in self.keys:
+            self.changed.add(team_id)
+
+    def update(self):
+        """
+        Move every team whose media changed since the last read to its new place
+        """
+        # After a whole tournament most teams moved, sorting again is cheaper
+        if len(self.changed) > len(self.keys) // 8:
+            self.rebuild()
+            return
+        for team_id in self.changed:
+            self.delete(self.keys[team_id])
+            self.add(team_id)
+        self.changed.clear()
+
+    def insert(self, key):
+        """
+        Insert a key in the bucket that covers it, splitting the bucket when it grows too big
+
+        Args:
+            key (tuple): The (-media, team_id) key
+        """
+        if not self.buckets:
+            self.buckets.append([key])
+            self.maxes.append(key)
+            return
+        position = min(bisect_left(self.maxes, key), len(self.maxes) - 1)
+        bucket = self.buckets[position]
+        insort(bucket, key)
+        self.maxes[position] = bucket[-1]
+        if len(bucket) > 2 * self.load:
+            self.buckets[position:position + 1] = [bucket[:self.load], bucket[self.load:]]
+            self.maxes[position:position + 1] = [bucket[self.load - 1], bucket[-1]]
+
+    def delete(self, key):
+        """
+        Delete a key from its bucket, dropping the bucket when it becomes empty
+
+        Args:
+            key (tuple): The (-media, team_id) key
+        """
+        position = bisect_left(self.maxes, key)
+        bucket = self.buckets[position]
+        del bucket[bisect_left(bucket, key)]
+        if bucket:
+            self.maxes[position] = bucket[-1]
+        else:
+            del self.buckets[position]
+            del self.maxes[position]
+
+    def page(self, start, count):
+        """
+        Return a range of the ranking without walking the teams before it
+
+        Args:
+            start (int): The position of the first team, 0 for the leader
+            count (int): The maximum number of teams to return
+
+        Returns:
+            list: The team ids from position start on, highest media first
+        """
+        self.update()
+        ids = []
+        for bucket in self.buckets:
+            if start >= len(bucket):
+                start -= len(bucket)
+                continue
+            ids.extend(key[1] for key in bucket[start:start + count - len(ids)])
+            start = 0
+            if len(ids) == count:
+                break
+        return ids
+
+    def rebuild(self):
+        """
+        Sort every ranked team again, for when the medias of the store were written directly
+        """
+        self.changed.clear()
+        keys = sorted((-self.store.medias[team_id], team_id) for team_id in self.keys)
+        self.keys = {key[1]: key for key in keys}
+        self.buckets = [keys[start:start + self.load] for start in range(0, len(keys), self.load)]
+        self.maxes = [bucket[-1] for bucket in self.buckets]
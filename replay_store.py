@@ -0,0 +1,167 @@
+import os
+import struct
+import numpy as np
+
+class Replay_store:
+    """
+    Stores simulated brackets on disk as compact fixed-size records: the initial
+    order of the bracket followed by one bit per match telling whether the second
+    team of the pairing won. A 32-team bracket takes 36 bytes, and the file is
+    read back through a memory map so queries never load it whole
+    """
+    header = struct.Struct('<4sIIB3x')
+    magic = b'TSRP'
+
+    def __init__(self, path, n_teams=None, places=None, chunk_size=1 << 20):
+        """
+        Open a replay file, creating it when n_teams and places are given and it does not exist.
+        When it exists, n_teams and places, if given, must match the ones of the file
+
+        Args:
+            path (str): The path of the replay file
+            n_teams (int, optional): Number of teams of the field, ids go from 0 to n_teams - 1
+            places (int, optional): Places of the bracket, a power of two
+            chunk_size (int): Replays decoded together by the queries, bounds the memory used
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        if os.path.exists(path):
+            with open(path, 'rb') as file:
+                magic, stored_teams, stored_places, id_bytes = self.header.unpack(file.read(self.header.size))
+            if magic != self.magic:
+                raise ValueError(f'{path} is not a replay file.')
+            asked = (stored_teams if n_teams is None else n_teams, stored_places if places is None else places)
+            if asked != (stored_teams, stored_places):
+                raise ValueError(f'{path} holds brackets of {stored_teams} teams and {stored_places} places, not {asked[0]} and {asked[1]}.')
+            n_teams, places = stored_teams, stored_places
+        else:
+            if n_teams is None or places is None:
+                raise ValueError(f'{path} does not exist, n_teams and places are needed to create it.')
+            # Smallest id width that leaves its largest value free for the byes
+            id_bytes = next(size for size in (1, 2, 4) if n_teams < (1 << (8 * size)) - 1)
+            with open(path, 'wb') as file:
+                file.write(self.header.pack(self.magic, n_teams, places, id_bytes))
+        self.n_teams = n_teams
+        self.places = places
+        self.bye = (1 << (8 * id_bytes)) - 1
+        self.dtype = np.dtype([('order', f'<u{id_bytes}', places), ('outcome', 'u1', (places + 6) // 8)])
+
+    def __len__(self):
+        """
+        Return the number of replays in the file
+
+        Returns:
+            int: The number of stored brackets
+        """
+        return (os.path.getsize(self.path) - self.header.size) // self.dtype.itemsize
+
+    def encode(self, alive):
+        """
+        Pack simulated brackets into records
+
+        Args:
+            alive (list): The arrays returned by Batch_tournament.simulate_chunk
+
+        Returns:
+            numpy.ndarray: One record per bracket
+        """
+        order = alive[0]
+        records = np.empty(len(order), dtype=self.dtype)
+        records['order'] = np.where(order >= self.n_teams, self.bye, order)
+        # Bit set when the second team of the pairing won, every round one after the other
+        bits = np.concatenate([after == before[:, 1::2] for before, after in zip(alive, alive[1:])], axis=1)
+        records['outcome'] = np.packbits(bits, axis=1, bitorder='little')
+        return records
+
+    def append(self, alive):
+        """
+        Encode simulated brackets and add them at the end of the file
+
+        Args:
+            alive (list): The arrays returned by Batch_tournament.simulate_chunk
+        """
+        with open(self.path, 'ab') as file:
+            self.encode(alive).tofile(file)
+
+    def records(self):
+        """
+        Map the records of the file without reading them
+
+        Returns:
+            numpy.memmap: The records, empty array if the file has no replays
+        """
+        if not len(self):
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode='r', offset=self.header.size)
+
+    def decode(self, records):
+        """
+        Replay stored brackets
+
+        Args:
+            records (numpy.ndarray): Records of the file
+
+        Returns:
+            list: The team ids alive at the start of every round, one (replays, teams) array per
+            round as in Batch_tournament.simulate_chunk, byes have the id n_teams
+        """
+        order = records['order'].astype(np.int64)
+        bracket = np.where(order == self.bye, self.n_teams, order)
+        bits = np.unpackbits(records['outcome'], axis=1, count=self.places - 1, bitorder='little').astype(bool)
+        alive = [bracket]
+        start = 0
+        while bracket.shape[1] > 1:
+            matches = bracket.shape[1] // 2
+            bracket = np.where(bits[:, start:start + matches], bracket[:, 1::2], bracket[:, 0::2])
+            alive.append(bracket)
+            start += matches
+        return alive
+
+    def chunks(self):
+        """
+        Decode the file one chunk of replays at a time
+
+        Returns:
+            generator: The decoded rounds of every chunk, as returned by decode
+        """
+        records = self.records()
+        for start in range(0, len(records), self.chunk_size):
+            yield self.decode(records[start:start + self.chunk_size])
+
+    def head_to_head(self, team1, team2):
+        """
+        Count how often two teams met and how often the first one won
+
+        Args:
+            team1 (int): The id of the first team
+            team2 (int): The id of the second team
+
+        Returns:
+            dict: 'meetings' between the teams and 'wins' of team1 over team2
+        """
+        meetings = wins = 0
+        for alive in self.chunks():
+            for before, after in zip(alive, alive[1:]):
+                first, second = before[:, 0::2], before[:, 1::2]
+                met = ((first == team1) & (second == team2)) | ((first == team2) & (second == team1))
+                meetings += int(met.sum())
+                wins += int((met & (after == team1)).sum())
+        return {'meetings': meetings, 'wins': wins}
+
+    def champions(self, finalist=None):
+        """
+        Count the titles of every team, optionally only over the replays where a team reached the final
+
+        Args:
+            finalist (int, optional): The id of a team that must have played the final
+
+        Returns:
+            numpy.ndarray: The number of titles of every team id
+        """
+        titles = np.zeros(self.n_teams, dtype=np.int64)
+        for alive in self.chunks():
+            champions = alive[-1][:, 0]
+            if finalist is not None:
+                champions = champions[(alive[-2] == finalist).any(axis=1)]
+            titles += np.bincount(champions, minlength=self.n_teams + 1)[:self.n_teams]
+        return titles
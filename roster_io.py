@@ -0,0 +1,312 @@
+import csv
+import json
+import os
+import struct
+from array import array
+import numpy as np
+
+# Binary rosters: a header, then blocks of teams, each block holding the count, the
+# medias, the cups, the byte length of every name and the UTF-8 names back to back
+MAGIC = b'TSRO'
+VERSION = 1
+HEADER = struct.Struct('<4sI')
+BLOCK = struct.Struct('<I')
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.bin': 'binary'}
+
+def roster_format(path, format=None):
+    """
+    Returns the format of a roster file, from its extension when not given
+
+    Args:
+        path (str): The path of the roster file
+        format (str, optional): 'csv', 'jsonl' or 'binary'
+
+    Returns:
+        str: The format of the file
+    """
+    if format is None:
+        format = FORMATS.get(os.path.splitext(path)[1].lower())
+    if format not in ('csv', 'jsonl', 'binary'):
+        raise ValueError(f'Unknown roster format for {path}, use .csv, .jsonl or .bin.')
+    return format
+
+def read_csv(path, chunk_size):
+    """
+    Reads a CSV roster with 'name,media' or 'name,media,cups' rows, skipping a header
+    row whose first cell is 'name'
+
+    Args:
+        path (str): The path of the roster file
+        chunk_size (int): The number of rows per chunk
+
+    Returns:
+        generator: (lines, names, medias, cups, errors) chunks of raw values
+    """
+    with open(path, newline='', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        first = True
+        chunk = ([], [], [], [], [])
+        for row in reader:
+            if not row:
+                continue
+            if first:
+                first = False
+                # Only a real header is skipped, any other row is validated and reported
+                if row[0].strip().lower() == 'name':
+                    continue
+            lines, names, medias, cups, _ = chunk
+            lines.append(reader.line_num)
+            names.append(row[0])
+            medias.append(row[1] if len(row) > 1 else '')
+            cups.append(row[2] if len(row) > 2 else 0)
+            if len(lines) == chunk_size:
+                yield chunk
+                chunk = ([], [], [], [], [])
+        if chunk[0]:
+            yield chunk
+
+def read_jsonl(path, chunk_size):
+    """
+    Reads a JSON Lines roster with one {"name", "media", "cups"} object per line,
+    cups being optional
+
+    Args:
+        path (str): The path of the roster file
+        chunk_size (int): The number of lines per chunk
+
+    Returns:
+        generator: (lines, names, medias, cups, errors) chunks of raw values
+    """
+    with open(path, encoding='utf-8') as file:
+        chunk = ([], [], [], [], [])
+        for line, text in enumerate(file, 1):
+            if not text.strip():
+                continue
+            lines, names, medias, cups, errors = chunk
+            try:
+                team = json.loads(text)
+                name, media, cup = str(team['name']), team['media'], team.get('cups', 0)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                errors.append((line, 'The line is not a JSON object with a name and a media.'))
+                continue
+            lines.append(line)
+            names.append(name)
+            medias.append(media)
+            cups.append(cup)
+            if len(lines) + len(errors) >= chunk_size:
+                yield chunk
+                chunk = ([], [], [], [], [])
+        if chunk[0] or chunk[4]:
+            yield chunk
+
+def read_binary(path, chunk_size):
+    """
+    Reads a binary roster block by block, medias and cups straight into arrays
+
+    Args:
+        path (str): The path of the roster file
+        chunk_size (int): Unused, the blocks are the ones written by save
+
+    Returns:
+        generator: (lines, names, medias, cups, errors) chunks, lines being record numbers
+    """
+    with open(path, 'rb') as file:
+        magic, version = HEADER.unpack(file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a binary roster.')
+        record = 1
+        while True:
+            head = file.read(BLOCK.size)
+            if not head:
+                return
+            (count,) = BLOCK.unpack(head)
+            medias = np.fromfile(file, dtype='<f8', count=count)
+            cups = np.fromfile(file, dtype='<i8', count=count)
+            lengths = np.fromfile(file, dtype='<u4', count=count)
+            blob = file.read(int(lengths.sum()))
+            if len(medias) < count or len(cups) < count or len(lengths) < count or len(blob) < lengths.sum():
+                raise ValueError(f'{path} is truncated.')
+            ends = np.cumsum(lengths).tolist()
+            names = [blob[start:end].decode('utf-8') for start, end in zip([0] + ends, ends)]
+            yield np.arange(record, record + count), names, medias, cups, []
+            record += count
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl, 'binary': read_binary}
+
+def to_numbers(values, dtype):
+    """
+    Converts raw values to numbers in one step, finding the bad ones only when there are some
+
+    Every value is read as a float, so a CSV and a JSON Lines roster accept the same
+    values: None, booleans, nan and infinities are never valid, and cups must be whole
+
+    Args:
+        values (sequence): Strings or numbers
+        dtype (numpy.dtype): numpy.float64 or numpy.int64
+
+    Returns:
+        numpy.ndarray: The numbers, 0 where a value is not valid
+        numpy.ndarray: True where the value is valid
+    """
+    if isinstance(values, np.ndarray) and values.dtype == dtype:
+        # Binary rosters, already numbers; only the medias can hold nan or infinities
+        return values, np.isfinite(values)
+    numbers = None
+    # NumPy would read None as nan and booleans as 0 and 1, they go to the slow path
+    if not any(value is None or isinstance(value, bool) for value in values):
+        try:
+            numbers = np.asarray(values, dtype=np.float64)
+        except (ValueError, TypeError, OverflowError):
+            pass
+    if numbers is None:
+        numbers = np.full(len(values), np.nan)
+        for position, value in enumerate(values):
+            if value is None or isinstance(value, bool):
+                continue
+            try:
+                numbers[position] = float(value)
+            except (ValueError, TypeError, OverflowError):
+                pass
+    valid = np.isfinite(numbers)
+    if dtype == np.float64:
+        return np.where(valid, numbers, 0.0), valid
+    # A cup of 2.9 is not 2 cups
+    valid &= (numbers == np.floor(numbers)) & (np.abs(numbers) < 2.0 ** 63)
+    return np.where(valid, numbers, 0.0).astype(np.int64), valid
+
+def validate(manager, lines, names, medias, cups):
+    """
+    Checks a chunk of rows with the rules of Tournament_manager.validate_team
+
+    Medias and cups are converted with NumPy for the whole chunk, and duplicates, with
+    the teams of the manager and within the chunk, are found in one pass over the names
+
+    Args:
+        manager (Tournament_manager): The manager receiving the teams
+        lines (sequence): The line of every row, for the error messages
+        names (list): The raw names
+        medias (sequence): The raw medias
+        cups (sequence): The raw cups
+
+    Returns:
+        list: The names of the valid rows
+        numpy.ndarray: Their medias
+        numpy.ndarray: Their cups
+        list: The (line, message) pairs of the rejected rows
+    """
+    raw_medias, raw_cups = medias, cups
+    medias, media_valid = to_numbers(medias, np.float64)
+    cups, cup_valid = to_numbers(cups, np.int64)
+    cup_valid &= cups >= 0
+    errors = []
+    keep = np.zeros(len(names), dtype=bool)
+    seen = set()
+    index = manager.index
+    for position, name in enumerate(names):
+        # Removing the whitespace leaves only the characters that must be letters
+        letters = ''.join(name.split())
+        if len(name) < 2 or (letters and not letters.isalpha()):
+            errors.append((int(lines[position]), f'Sorry, {name} is too short or contains invalid characters.'))
+        elif not media_valid[position]:
+            errors.append((int(lines[position]), f'{raw_medias[position]} is not a valid number for media.'))
+        elif not cup_valid[position]:
+            errors.append((int(lines[position]), f'{raw_cups[position]} is not a valid number of cups.'))
+        else:
+            key = name.lower()
+            if key in index or key in seen:
+                errors.append((int(lines[position]), f'The name {name} already exists.'))
+            else:
+                seen.add(key)
+                keep[position] = True
+    return [name for name, kept in zip(names, keep) if kept], medias[keep], cups[keep], errors
+
+def load(path, manager, format=None, chunk_size=65536):
+    """
+    Adds the teams of a roster file to a manager, chunk by chunk
+
+    Args:
+        path (str): The path of the roster file
+        manager (Tournament_manager): The manager receiving the teams
+        format (str, optional): 'csv', 'jsonl' or 'binary', from the extension when missing
+        chunk_size (int): The number of rows validated and added together
+
+    Returns:
+        dict: 'created' with the number of teams added and 'errors' with the
+        (line, message) pairs of the rejected rows, line being the record number
+        in binary files
+    """
+    reader = READERS[roster_format(path, format)]
+    added = []
+    errors = []
+    for lines, names, medias, cups, read_errors in reader(path, chunk_size):
+        errors.extend(read_errors)
+        names, medias, cups, chunk_errors = validate(manager, lines, names, medias, cups)
+        errors.extend(chunk_errors)
+        if names:
+            added.append(manager.add_teams(names, array('d', medias.astype('=f8').tobytes()), array('q', cups.astype('=i8').tobytes()), rank=False))
+    # The whole file is ranked with one sort instead of one per chunk
+    manager.ranking.add_many(team_id for ids in added for team_id in ids)
+    errors.sort()
+    created = sum(map(len, added))
+    return {'created': created, 'errors': errors}
+
+def chunks(manager, chunk_size):
+    """
+    Splits the teams of a manager into chunks of names, medias and cups
+
+    Args:
+        manager (Tournament_manager): The manager holding the teams
+        chunk_size (int): The number of teams per chunk
+
+    Returns:
+        generator: (names, medias, cups) chunks, medias and cups as NumPy arrays
+    """
+    store = manager.store
+    ids = np.fromiter((team.id for team in manager.teams), dtype=np.int64, count=len(manager.teams))
+    medias = np.frombuffer(store.medias, dtype=np.float64) if len(store) else np.zeros(0)
+    cups = np.frombuffer(store.cups, dtype=np.int64) if len(store) else np.zeros(0, dtype=np.int64)
+    for start in range(0, len(ids), chunk_size):
+        block = ids[start:start + chunk_size]
+        yield [store.names[team_id] for team_id in block.tolist()], medias[block], cups[block]
+
+def save(path, manager, format=None, chunk_size=65536):
+    """
+    Writes the teams of a manager, with their media and cups, to a roster file
+
+    Args:
+        path (str): The path of the roster file
+        manager (Tournament_manager): The manager holding the teams
+        format (str, optional): 'csv', 'jsonl' or 'binary', from the extension when missing
+        chunk_size (int): The number of teams written together
+
+    Returns:
+        int: The number of teams written
+    """
+    format = roster_format(path, format)
+    written = 0
+    if format == 'binary':
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION))
+            for names, medias, cups in chunks(manager, chunk_size):
+                encoded = [name.encode('utf-8') for name in names]
+                file.write(BLOCK.pack(len(names)))
+                file.write(medias.astype('<f8').tobytes())
+                file.write(cups.astype('<i8').tobytes())
+                file.write(np.fromiter(map(len, encoded), dtype='<u4', count=len(encoded)).tobytes())
+                file.write(b''.join(encoded))
+                written += len(names)
+        return written
+
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file) if format == 'csv' else None
+        if writer is not None:
+            writer.writerow(['name', 'media', 'cups'])
+        for names, medias, cups in chunks(manager, chunk_size):
+            rows = zip(names, medias.tolist(), cups.tolist())
+            if writer is not None:
+                writer.writerows(rows)
+            else:
+                file.writelines(json.dumps({'name': name, 'media': media, 'cups': cup}) + '\n' for name, media, cup in rows)
+            written += len(names)
+    return written
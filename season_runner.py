@@ -0,0 +1,133 @@
+import json
+import os
+import numpy as np
+from batch_tournament import Batch_tournament
+
+class Season_runner:
+    """
+    Plays one tournament per season, carrying the media drift and the cups of every
+    team into the next season, as repeated start_tournament runs do. The state can be
+    saved to a compact checkpoint every few seasons and a run resumes from it exactly
+    """
+    def __init__(self, medias, cups=None, seed=None, checkpoint=None, every=1000, winner_bonus=0.7, loser_bonus=0.5):
+        """
+        Initialize the runner, resuming from the checkpoint when the file exists
+
+        Args:
+            medias (sequence): The media rating of every team before the first season
+            cups (sequence, optional): The cups already won by every team, 0 when missing
+            seed (int, optional): Seed of the random stream, ignored when resuming
+            checkpoint (str, optional): Path of the checkpoint file, no checkpoints when missing
+            every (int): Seasons played between two checkpoints
+            winner_bonus (float): Media added to the winner of every match
+            loser_bonus (float): Media added to the loser of every match
+        """
+        self.medias = np.array(medias, dtype=np.float64)
+        if len(self.medias) < 2:
+            raise ValueError(f'A season needs at least 2 teams, got {len(self.medias)}.')
+        self.cups = np.zeros(len(self.medias), dtype=np.int64) if cups is None else np.array(cups, dtype=np.int64)
+        self.rng = np.random.default_rng(seed)
+        self.season = 0
+        self.checkpoint = checkpoint
+        self.every = every
+        self.winner_bonus = winner_bonus
+        self.loser_bonus = loser_bonus
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self.load()
+
+    @classmethod
+    def from_manager(cls, manager, **kwargs):
+        """
+        Build a runner over the teams registered in a Tournament_manager
+
+        Args:
+            manager (Tournament_manager): The manager whose teams play every season
+            kwargs: Any other argument accepted by Season_runner
+
+        Returns:
+            Season_runner: A runner starting from the current media and cups of the teams
+        """
+        return cls([team.media for team in manager.teams], cups=[team.cup for team in manager.teams], **kwargs)
+
+    def play_season(self):
+        """
+        Play one tournament with the current ratings and carry its results forward
+
+        Returns:
+            int: The id of the champion
+        """
+        # The engine is rebuilt every season so the byes go to the current best teams
+        engine = Batch_tournament(self.medias, winner_bonus=self.winner_bonus, loser_bonus=self.loser_bonus)
+        alive = engine.simulate_chunk(1, self.rng)
+        for teams, winners in zip(alive, alive[1:]):
+            pairs, winners = teams[0].reshape(-1, 2), winners[0]
+            losers = np.where(pairs[:, 0] == winners, pairs[:, 1], pairs[:, 0])
+            # Byes only happen in the first round and never change a media
+            played = (pairs != engine.bye).all(axis=1)
+            self.medias[winners[played]] += self.winner_bonus
+            self.medias[losers[played]] += self.loser_bonus
+        champion = int(alive[-1][0, 0])
+        self.cups[champion] += 1
+        self.season += 1
+        return champion
+
+    def run(self, seasons):
+        """
+        Play until a number of seasons have been played in total, saving a checkpoint
+        every self.every seasons and at the end
+
+        Args:
+            seasons (int): The total number of seasons, counting those already played
+
+        Returns:
+            int: The number of seasons played in this call
+        """
+        start = self.season
+        while self.season < seasons:
+            self.play_season()
+            if self.checkpoint is not None and self.season % self.every == 0:
+                self.save()
+        if self.checkpoint is not None and self.season > start and self.season % self.every:
+            self.save()
+        return self.season - start
+
+    def save(self):
+        """
+        Write the ratings, cups, random stream state and season to the checkpoint
+
+        The file is written next to the checkpoint and renamed over it, so a run killed
+        while saving leaves the previous checkpoint whole
+        """
+        temporary = f'{self.checkpoint}.tmp'
+        with open(temporary, 'wb') as file:
+            np.savez(file, medias=self.medias, cups=self.cups, season=np.int64(self.season), rng=np.array(json.dumps(self.rng.bit_generator.state)))
+        os.replace(temporary, self.checkpoint)
+
+    def load(self):
+        """
+        Restore the state saved in the checkpoint
+        """
+        with np.load(self.checkpoint) as data:
+            if len(data['medias']) != len(self.medias):
+                raise ValueError(f'The checkpoint {self.checkpoint} holds {len(data["medias"])} teams, not {len(self.medias)}.')
+            self.medias = data['medias'].copy()
+            self.cups = data['cups'].copy()
+            self.season = int(data['season'])
+            state = json.loads(str(data['rng']))
+        bit_generator = getattr(np.random, state['bit_generator'])()
+        bit_generator.state = state
+        self.rng = np.random.Generator(bit_generator)
+
+    def apply(self, manager):
+        """
+        Write the ratings and cups back into the teams of a Tournament_manager
+
+        Args:
+            manager (Tournament_manager): The manager the runner was built from
+        """
+        store = manager.store
+        for position, team in enumerate(manager.teams):
+            store.medias[team.id] = float(self.medias[position])
+            store.cups[team.id] = int(self.cups[position])
+        # The arrays were written directly, so the ranking is rebuilt once instead of per team
+        manager.ranking.rebuild()
@@ -0,0 +1,144 @@
+import argparse
+import json
+import sys
+from tournament_manager import Tournament_manager
+
+def read_roster(path, manager):
+    """
+    Registers in a manager the teams of a roster file: CSV with one 'name,media' row
+    per team, JSON Lines or binary, as read by roster_io.load
+
+    Args:
+        path (str): The path of the roster file
+        manager (Tournament_manager): The manager receiving the teams
+
+    Returns:
+        list: The (line, message) pairs of the rows that were rejected
+    """
+    # Loaded here, like the engines, so --help does not need NumPy
+    import roster_io
+
+    return roster_io.load(path, manager)['errors']
+
+def parse_args(argv):
+    """
+    Parses the command line arguments
+
+    Args:
+        argv (list): The arguments, without the program name
+
+    Returns:
+        argparse.Namespace: The parsed arguments
+    """
+    parser = argparse.ArgumentParser(prog='python -m simulate', description='Simulate tournaments over a roster without the GUI and stream the odds as JSON lines.')
+    parser.add_argument('roster', help="roster file: .csv with one 'name,media' row per team, .jsonl or .bin")
+    parser.add_argument('-n', '--brackets', type=int, default=100000, help='number of tournaments to simulate')
+    parser.add_argument('--batch', type=int, default=262144, help='tournaments per streamed result line')
+    parser.add_argument('--seed', type=int, default=None, help='master seed, printed in every line to reproduce the run')
+    parser.add_argument('--workers', type=int, default=1, help='number of worker processes')
+    parser.add_argument('--profile', metavar='REPORT', help='run under cProfile and write the report to this file')
+    parser.add_argument('--seasons', type=int, help='play this many seasons in a row, carrying media and cups forward, instead of independent tournaments')
+    parser.add_argument('--checkpoint', metavar='FILE', help='with --seasons, save the state to this file and resume from it when it exists')
+    parser.add_argument('--every', type=int, default=1000, help='seasons played between two checkpoints')
+    args = parser.parse_args(argv)
+    # Every count is used as a step or a divisor, 0 or less has no meaning
+    for option in ('brackets', 'batch', 'workers', 'seasons', 'every'):
+        value = getattr(args, option)
+        if value is not None and value < 1:
+            parser.error(f'--{option} must be at least 1, got {value}')
+    return args
+
+def main(argv=None):
+    """
+    Reads the roster and runs the simulations, under cProfile if asked
+
+    Args:
+        argv (list, optional): The arguments, defaults to sys.argv[1:]
+
+    Returns:
+        int: The exit status
+    """
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    manager = Tournament_manager()
+    for line, message in read_roster(args.roster, manager):
+        print(f'{args.roster}:{line}: {message}', file=sys.stderr)
+    if len(manager.teams) < 2:
+        print('You need at least 2 teams to create the tournament.', file=sys.stderr)
+        return 1
+
+    if args.profile:
+        from instrumentation import profile
+        with profile(args.profile):
+            return run(args, manager)
+    return run(args, manager)
+
+def run(args, manager):
+    """
+    Runs the mode asked for on the command line
+
+    Args:
+        args (argparse.Namespace): The parsed arguments
+        manager (Tournament_manager): The manager holding the roster
+
+    Returns:
+        int: The exit status
+    """
+    if args.seasons is not None:
+        return seasons(args, manager)
+    return simulate(args, manager)
+
+def seasons(args, manager):
+    """
+    Plays the seasons and writes one JSON line with the media and cups of every team
+    each time a checkpoint is due, and once more at the end
+
+    Args:
+        args (argparse.Namespace): The parsed arguments
+        manager (Tournament_manager): The manager holding the roster
+
+    Returns:
+        int: The exit status
+    """
+    from season_runner import Season_runner
+
+    runner = Season_runner.from_manager(manager, seed=args.seed, checkpoint=args.checkpoint, every=args.every)
+    names = [team.name for team in manager.teams]
+    while True:
+        target = min(args.seasons, (runner.season // args.every + 1) * args.every)
+        runner.run(target)
+        teams = {name: {'media': media, 'cups': cups} for name, media, cups in zip(names, runner.medias.tolist(), runner.cups.tolist())}
+        print(json.dumps({'season': runner.season, 'teams': teams}), flush=True)
+        if runner.season >= args.seasons:
+            return 0
+
+def simulate(args, manager):
+    """
+    Runs the simulations and writes one JSON line per batch with the odds so far
+
+    Args:
+        args (argparse.Namespace): The parsed arguments
+        manager (Tournament_manager): The manager holding the roster
+
+    Returns:
+        int: The exit status
+    """
+    # NumPy and the engines are only loaded once there is something to simulate
+    import numpy as np
+    from parallel_runner import Parallel_runner, merge_results
+
+    runner = Parallel_runner.from_manager(manager, workers=args.workers, shard_size=min(args.batch, 262144))
+    master = np.random.SeedSequence(args.seed)
+    names = [team.name for team in manager.teams]
+    total = None
+    done = 0
+    for child in master.spawn(-(-args.brackets // args.batch)):
+        count = min(args.batch, args.brackets - done)
+        total = merge_results([result for result in (total, runner.run(count, child)) if result is not None])
+        done += count
+        odds = total['titles'] / total['brackets']
+        line = {'seed': master.entropy, 'brackets': total['brackets'], 'titles': dict(zip(names, odds.tolist()))}
+        print(json.dumps(line), flush=True)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
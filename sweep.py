@@ -0,0 +1,178 @@
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from batch_tournament import Batch_tournament
+
+# Settings of a cell and their defaults, the ones of Tournament. The loser bonus is not
+# one: the loser of a match is out of the bracket, so it never changes a result
+DEFAULTS = {'winner_bonus': 0.7, 'seeding': 'media'}
+
+def run_cell(medias, settings, brackets, seed):
+    """
+    Simulate the brackets of one cell of the grid, used by the worker processes
+
+    Args:
+        medias (numpy.ndarray): The media rating of every team
+        settings (dict): The winner_bonus and seeding of the cell
+        brackets (int): The number of brackets to simulate
+        seed (int): Seed of the random stream
+
+    Returns:
+        dict: The aggregate, as returned by Batch_tournament.run
+    """
+    return Batch_tournament(medias, **settings).run(brackets, seed)
+
+class Sweep:
+    """
+    Runs a batch simulation for every cell of a grid of settings and keeps the
+    aggregates in an on-disk cache, keyed by a hash of the roster, the settings, the
+    number of brackets and the seed, so an overlapping grid only computes the new cells
+    """
+    def __init__(self, medias, cache_dir, brackets=100000, seed=0, workers=1):
+        """
+        Initialize the sweep over a roster
+
+        Args:
+            medias (sequence): The media rating of every team, indexed by team id
+            cache_dir (str): The directory of the cache, created when missing
+            brackets (int): The number of brackets simulated per cell
+            seed (int): Seed of the random stream of every cell
+            workers (int): Number of processes computing the missing cells
+        """
+        self.medias = np.asarray(medias, dtype=np.float64)
+        self.cache_dir = cache_dir
+        self.brackets = brackets
+        self.seed = seed
+        self.workers = workers
+        self.roster = hashlib.sha256(self.medias.astype('<f8').tobytes()).hexdigest()
+        self.computed = 0
+        self.cached = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @classmethod
+    def from_manager(cls, manager, cache_dir, **kwargs):
+        """
+        Build a sweep over the teams registered in a Tournament_manager
+
+        Args:
+            manager (Tournament_manager): The manager whose teams enter every bracket
+            cache_dir (str): The directory of the cache
+            kwargs: Any other argument accepted by Sweep
+
+        Returns:
+            Sweep: A sweep over the current media of the teams
+        """
+        return cls([team.media for team in manager.teams], cache_dir, **kwargs)
+
+    @staticmethod
+    def cells(grid):
+        """
+        Expand a grid into its cells
+
+        Args:
+            grid (dict): A list of values per setting, missing settings keep their default
+
+        Returns:
+            list: The settings of every cell, a dict with every setting
+        """
+        if 'loser_bonus' in grid:
+            raise ValueError('loser_bonus has no effect on a single bracket, the loser is out; sweep it over seasons instead.')
+        unknown = set(grid) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f'Unknown settings {sorted(unknown)}, use {sorted(DEFAULTS)}.')
+        names = list(DEFAULTS)
+        values = [list(grid.get(name, [DEFAULTS[name]])) for name in names]
+        cells = [dict(zip(names, cell)) for cell in itertools.product(*values)]
+        # 1 and 1.0 are the same bonus, and must give the same cache key
+        for cell in cells:
+            cell['winner_bonus'] = float(cell['winner_bonus'])
+        return cells
+
+    def key(self, settings):
+        """
+        Return the cache key of a cell
+
+        Args:
+            settings (dict): The settings of the cell
+
+        Returns:
+            str: The sha256 of the roster, the settings, the brackets and the seed
+        """
+        config = {'roster': self.roster, 'settings': settings, 'brackets': self.brackets, 'seed': self.seed}
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()
+
+    def path(self, settings):
+        """
+        Return the file of a cell in the cache
+
+        Args:
+            settings (dict): The settings of the cell
+
+        Returns:
+            str: The path of the .npz file
+        """
+        return os.path.join(self.cache_dir, f'{self.key(settings)}.npz')
+
+    def load(self, settings):
+        """
+        Read the aggregate of a cell from the cache
+
+        Args:
+            settings (dict): The settings of the cell
+
+        Returns:
+            dict: The aggregate, None when the cell was never computed
+        """
+        path = self.path(settings)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return {'brackets': int(data['brackets']), 'titles': data['titles'].copy(), 'rounds': data['rounds'].copy()}
+
+    def store(self, settings, result):
+        """
+        Write the aggregate of a cell to the cache, through a temporary file renamed
+        over the cell, so an interrupted sweep never leaves half a cell behind
+
+        Args:
+            settings (dict): The settings of the cell
+            result (dict): The aggregate, as returned by Batch_tournament.run
+        """
+        path = self.path(settings)
+        temporary = f'{path}.tmp'
+        with open(temporary, 'wb') as file:
+            np.savez(file, brackets=np.int64(result['brackets']), titles=result['titles'], rounds=result['rounds'])
+        os.replace(temporary, path)
+
+    def run(self, grid):
+        """
+        Return the aggregate of every cell of a grid, computing only the cells missing from the cache
+
+        Args:
+            grid (dict): A list of values per setting: winner_bonus and seeding
+
+        Returns:
+            list: A (settings, aggregate) pair per cell, aggregates as returned by Batch_tournament.run
+        """
+        cells = self.cells(grid)
+        results = [self.load(settings) for settings in cells]
+        missing = [position for position, result in enumerate(results) if result is None]
+        self.cached += len(cells) - len(missing)
+        self.computed += len(missing)
+
+        arguments = ([self.medias] * len(missing), [cells[position] for position in missing], [self.brackets] * len(missing), [self.seed] * len(missing))
+        if self.workers == 1 or len(missing) <= 1:
+            computed = map(run_cell, *arguments)
+            for position, result in zip(missing, computed):
+                self.store(cells[position], result)
+                results[position] = result
+        else:
+            with ProcessPoolExecutor(min(self.workers, len(missing))) as pool:
+                for position, result in zip(missing, pool.map(run_cell, *arguments)):
+                    # Stored as soon as it arrives, so the cells done survive an interruption
+                    self.store(cells[position], result)
+                    results[position] = result
+        return list(zip(cells, results))
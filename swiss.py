@@ -0,0 +1,122 @@
+import math
+from tournament import Tournament
+
+class Swiss(Tournament):
+    """
+    Swiss-system event: every round teams meet opponents with the same score, nobody
+    is eliminated and no two teams meet twice when it can be avoided. Matches use
+    play_ids, so results follow the media win model and drift of Tournament.play
+    """
+    def __init__(self, teams, store=None, window=32):
+        """
+        Initialize the event with every team at 0 points
+
+        Parameters:
+        teams (list): A list of Team objects entering the event
+        store (Team_store, optional): The store holding the teams
+        window (int): How many of the next ranked teams are tried to avoid a rematch
+        """
+        super().__init__(teams, store)
+        self.window = window
+        self.ids = [team.id for team in teams]
+        self.scores = dict.fromkeys(self.ids, 0)
+        self.opponents = {team_id: set() for team_id in self.ids}
+        self.byes = set()
+        self.rounds_played = 0
+
+    def ranking(self):
+        """
+        Return the team ids ordered by score, ties broken by media
+
+        Returns:
+        list: The team ids, leader first
+        """
+        medias = self.store.medias
+        return sorted(self.ids, key=lambda team_id: (-self.scores[team_id], -medias[team_id]))
+
+    def pair(self):
+        """
+        Pair the teams for the next round
+
+        Teams are ranked by score and each one, from the top, meets the first team below
+        it that it has not played yet among the next self.window teams. When a score
+        group has an odd number of teams its last team floats down and meets the top
+        of the next group. A rematch is only accepted when the whole window was played
+        already. The cost is one sort plus O(window) per team
+
+        Returns:
+        list: The (team1, team2) id pairs of the round
+        int: The id of the team that rests and gets a point, None with an even field
+        """
+        ranked = self.ranking()
+        bye = None
+        if len(ranked) % 2:
+            # The lowest ranked team that has not rested yet gets the bye
+            bye = next((team_id for team_id in reversed(ranked) if team_id not in self.byes), ranked[-1])
+            ranked.remove(bye)
+
+        # Reversed so the leader is popped from the end in O(1)
+        pool = ranked[::-1]
+        pairs = []
+        while pool:
+            team = pool.pop()
+            played = self.opponents[team]
+            choice = len(pool) - 1
+            for position in range(len(pool) - 1, max(-1, len(pool) - 1 - self.window), -1):
+                if pool[position] not in played:
+                    choice = position
+                    break
+            pairs.append((team, pool.pop(choice)))
+        return pairs, bye
+
+    def play_round(self):
+        """
+        Pair and play one round, updating scores and the teams already met
+
+        Returns:
+        list: The (team1, team2, winner) ids of every match of the round
+        """
+        pairs, bye = self.pair()
+        results = []
+        for team1, team2 in pairs:
+            winner = self.play_ids(team1, team2)
+            self.scores[winner] += 1
+            self.opponents[team1].add(team2)
+            self.opponents[team2].add(team1)
+            results.append((team1, team2, winner))
+        if bye is not None:
+            self.scores[bye] += 1
+            self.byes.add(bye)
+        self.rounds_played += 1
+        return results
+
+    def run(self, rounds=None):
+        """
+        Play every round and give a cup to the winner of the event
+
+        Parameters:
+        rounds (int, optional): The number of rounds, defaults to log2 of the field rounded up
+
+        Returns:
+        list: The final standings, as returned by standings
+        """
+        if rounds is None:
+            rounds = max(1, math.ceil(math.log2(len(self.ids))))
+        for _ in range(rounds):
+            self.play_round()
+        table = self.standings()
+        self.store.cups[table[0][0]] += 1
+        return table
+
+    def standings(self):
+        """
+        Return the standings, with the Buchholz score (sum of the scores of the opponents) as tie-break
+
+        Returns:
+        list: (team id, score, buchholz) tuples, leader first
+        """
+        scores = self.scores
+        buchholz = {team_id: sum(scores[opponent] for opponent in self.opponents[team_id]) for team_id in self.ids}
+        medias = self.store.medias
+        order = sorted(self.ids, key=lambda team_id: (-scores[team_id], -buchholz[team_id], -medias[team_id]))
+        return [(team_id, scores[team_id], buchholz[team_id]) for team_id in order]
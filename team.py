@@ -1,15 +1,144 @@
+from array import array
+
+class Team_store:
+    """
+    Stores teams in parallel arrays of names, medias and cups, indexed by an integer team id
+    """
+    def __init__(self):
+        """
+        Initialize an empty store
+
+        Listeners are objects with a media_changed(team_id, old_media) method, called
+        every time set_media changes the media of a team
+        """
+        self.names = []
+        self.medias = array('d')
+        self.cups = array('q')
+        self.listeners = []
+
+    def __len__(self):
+        """
+        Return the number of teams ever added to the store
+
+        Returns:
+        int: The number of team ids in use
+        """
+        return len(self.names)
+
+    def add(self, name, media):
+        """
+        Add a team to the store
+
+        Parameters:
+        name (str): The name of the team
+        media (float): The media rating of the team
+
+        Returns:
+        int: The id of the new team
+        """
+        self.names.append(name)
+        self.medias.append(media)
+        self.cups.append(0)
+        return len(self.names) - 1
+
+    def extend(self, names, medias, cups=None):
+        """
+        Add many teams to the store at once
+
+        Parameters:
+        names (list): The names of the teams
+        medias (sequence): The media rating of every team, an array('d') is copied without a loop
+        cups (sequence, optional): The cups of every team, 0 when missing; an array('q') is copied without a loop
+
+        Returns:
+        range: The ids of the new teams
+        """
+        start = len(self.names)
+        self.names.extend(names)
+        self.medias.extend(medias if isinstance(medias, array) else array('d', medias))
+        if cups is None:
+            cups = array('q', bytes(8 * len(names)))
+        self.cups.extend(cups if isinstance(cups, array) else array('q', cups))
+        return range(start, len(self.names))
+
+    def set_media(self, team_id, media):
+        """
+        Change the media of a team and tell the listeners
+
+        Parameters:
+        team_id (int): The id of the team
+        media (float): The new media rating
+        """
+        old = self.medias[team_id]
+        self.medias[team_id] = media
+        for listener in self.listeners:
+            listener.media_changed(team_id, old)
+
+    def team(self, team_id):
+        """
+        Return a Team view over a stored team
+
+        Parameters:
+        team_id (int): The id of the team
+
+        Returns:
+        Team: A view reading and writing the arrays of the store
+        """
+        team = Team.__new__(Team)
+        team.store = self
+        team.id = team_id
+        return team
+
 class Team:
-    def __init__(self, name, media):
+    __slots__ = ('store', 'id')
+
+    def __init__(self, name, media, store=None):
         """
         Initialize a Team object with a name, media rating, and cup count
 
         Parameters:
         name (str): The name of the team
         media (float): The media rating of the team, representing its strength
+        store (Team_store, optional): The store holding the team, a private one is used if missing
+        """
+        self.store = store if store is not None else Team_store()
+        self.id = self.store.add(name, media)
+
+    @property
+    def name(self):
+        return self.store.names[self.id]
+
+    @name.setter
+    def name(self, value):
+        self.store.names[self.id] = value
+
+    @property
+    def media(self):
+        return self.store.medias[self.id]
+
+    @media.setter
+    def media(self, value):
+        self.store.set_media(self.id, value)
+
+    @property
+    def cup(self):
+        return self.store.cups[self.id]
+
+    @cup.setter
+    def cup(self, value):
+        self.store.cups[self.id] = value
+
+    def __eq__(self, other):
         """
-        self.name = name
-        self.media = media
-        self.cup = 0
+        Two views are the same team when they point to the same id of the same store
+        """
+        if not isinstance(other, Team):
+            return NotImplemented
+        return self.id == other.id and self.store is other.store
+
+    def __hash__(self):
+        return hash((id(self.store), self.id))
+
     def __str__(self):
         """
         Return a string representation of the Team object
@@ -1,13 +1,74 @@
+import heapq
 import random
+from collections import namedtuple
+from operator import attrgetter
+
+# One simulated match: team ids, the chance team1 had of winning and the id of the winner
+Match_event = namedtuple('Match_event', ['tournament', 'round', 'slot', 'team1', 'team2', 'probability', 'winner'])
+
+def seed_order(teams):
+    """
+    Return the places of the seeds in a seeded bracket: seed 0 meets the last seed,
+    and the two best seeds can only meet in the final
+
+    Parameters:
+    teams (int): The number of teams, the bracket has the next power of two of places
+
+    Returns:
+    list: The seed, counted from 0, in every place; seeds past the teams are byes
+    """
+    order = [0]
+    while len(order) < teams:
+        size = 2 * len(order)
+        order = [place for seed in order for place in (seed, size - 1 - seed)]
+    return order
+
+def shuffle_pairs(holders, rest):
+    """
+    Pair every bye holder with a bye and the other teams two by two, then shuffle the
+    pairs, drawing the same order random.shuffle would give a list of the pairs
+
+    The pairs are shuffled by index, so a large field does not keep a tuple per pair alive
+
+    Parameters:
+    holders (list): The teams that get a bye
+    rest (list): The other teams, paired in their order
+
+    Returns:
+    list: The bracket order, with None in the place of every bye
+    """
+    places = [None] * (2 * len(holders))
+    places[0::2] = holders
+    places += rest
+    order = list(range(len(places) // 2))
+    random.shuffle(order)
+    bracket = [None] * len(places)
+    bracket[0::2] = [places[2 * pair] for pair in order]
+    bracket[1::2] = [places[2 * pair + 1] for pair in order]
+    return bracket
+
 class Tournament:
-    def __init__(self, teams):
+    # Set to an Instrumentation object to collect counters and timers, None costs nothing
+    instrumentation = None
+    # Media added to the winner and to the loser of every match
+    winner_bonus = 0.7
+    loser_bonus = 0.5
+    # How seed places the teams: 'media' gives the byes to the highest media and keeps the
+    # draw, 'random' gives them to any team and 'ranked' builds a seeded bracket by media
+    seeding = 'media'
+
+    def __init__(self, teams, store=None):
         """
         Initialize the Tournament with a list of teams
 
         Parameters:
         teams (list): A list of Team objects participating in the tournament
+        store (Team_store, optional): The store holding the teams, needed to play by team id
         """
         self.teams = teams
+        if store is None:
+            store = next((team.store for team in teams if team is not None), None)
+        self.store = store
 
     def show_matches(self, teams):
         """
@@ -38,30 +99,173 @@ class Tournament:
         
         return teams
     
+    def seed(self, teams):
+        """
+        Place the teams in the bracket with the policy of self.seeding
+
+        Parameters:
+        teams (list): A list of Team objects, already shuffled
+
+        Returns:
+        list: The bracket order, with None in the place of every bye
+        """
+        if self.seeding == 'media':
+            return self.seed_byes(teams)
+        if self.seeding == 'random':
+            # The teams are shuffled already, so the first ones get the byes; the pairs are
+            # shuffled like in seed_byes, so byes do not all sit in the same half
+            size = 1 << (len(teams) - 1).bit_length()
+            byes = size - len(teams)
+            return shuffle_pairs(teams[:byes], teams[byes:])
+        if self.seeding == 'ranked':
+            # Stable sort, so teams with the same media keep the order of the draw
+            ranked = sorted(teams, key=lambda team: -team.media)
+            return [ranked[seed] if seed < len(ranked) else None for seed in seed_order(len(teams))]
+        raise ValueError(f"Unknown seeding {self.seeding!r}, use 'media', 'random' or 'ranked'.")
+
+    def seed_byes(self, teams):
+        """
+        Fill the field up to the next power of two with byes, given to the teams with the highest media
+
+        Parameters:
+        teams (list): A list of Team objects, already in the order wanted for the bracket
+
+        Returns:
+        list: The bracket order, with None in the place of every bye
+        """
+        size = 1 << (len(teams) - 1).bit_length()
+        byes = size - len(teams)
+        if not byes:
+            return teams
+
+        # Every bye is paired with one of the strongest teams, the rest keep their order
+        # Chosen by id through a mask over the store, as probing a set of Team views goes
+        # through their Python __hash__ and __eq__
+        ids = list(map(attrgetter('id'), teams))
+        medias = teams[0].store.medias
+        held = bytearray(len(medias))
+        for team_id in heapq.nlargest(byes, ids, key=medias.__getitem__):
+            held[team_id] = 1
+        flags = bytes(map(held.__getitem__, ids))
+        # Both in draw order
+        holders = [team for team, flag in zip(teams, flags) if flag]
+        rest = [team for team, flag in zip(teams, flags) if not flag]
+        return shuffle_pairs(holders, rest)
+
     def advance(self, tournament):
         """
         Simulate the advancement of teams through the tournament rounds
 
         Parameters:
-        tournament (list): A list of Team objects representing the current round
+        tournament (list): A list of Team objects representing the current round, None for a bye
 
         Returns:
         list: A list of Team objects representing the winners of the round
         """
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start = instrumentation.clock()
         winners = []
         
         # Iterate over pairs of teams in the tournament list
         for i in range(0, len(tournament), 2):
             team1, team2 = tournament[i], tournament[i + 1]
+            # A team facing a bye goes through without playing
+            if team1 is None or team2 is None:
+                winners.append(team2 if team1 is None else team1)
+                continue
             # Use the 'play' method to simulate the winner of the match
             winners.append(self.play(team1, team2))
             
         # If there's only one winner left, update their cup count
         if len(winners) == 1:
-            team = self.teams[self.teams.index(winners[0])]
-            team.cup += 1
+            winners[0].cup += 1
+        if instrumentation is not None:
+            instrumentation.round(len(tournament), start)
+        return winners
+
+    def advance_ids(self, tournament):
+        """
+        Simulate a round of the tournament using team ids of self.store
+
+        Parameters:
+        tournament (list): The ids of the teams in the current round in bracket order, None for a bye
+
+        Returns:
+        list: The ids of the winners of the round
+        """
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start = instrumentation.clock()
+        winners = []
+        for i in range(0, len(tournament), 2):
+            team1, team2 = tournament[i], tournament[i + 1]
+            if team1 is None or team2 is None:
+                winners.append(team2 if team1 is None else team1)
+            else:
+                winners.append(self.play_ids(team1, team2))
+
+        # If there's only one winner left, update their cup count
+        if len(winners) == 1:
+            self.store.cups[winners[0]] += 1
+        if instrumentation is not None:
+            instrumentation.round(len(tournament), start)
         return winners
     
+    def play_events(self, tournament, number=0):
+        """
+        Simulate a whole bracket of team ids of self.store, yielding every match as it is played
+
+        Only the current round is kept in memory, and the champion gets its cup once the last
+        match has been yielded
+
+        Parameters:
+        tournament (list): The ids of the teams in bracket order, None for a bye
+        number (int): The number of the tournament, copied into every event
+
+        Returns:
+        generator: A Match_event per match played, byes are not matches and are skipped
+        """
+        medias = self.store.medias
+        stage = 0
+        while len(tournament) > 1:
+            winners = []
+            for slot in range(len(tournament) // 2):
+                team1, team2 = tournament[2 * slot], tournament[2 * slot + 1]
+                if team1 is None or team2 is None:
+                    winners.append(team2 if team1 is None else team1)
+                    continue
+                probability = medias[team1] / (medias[team1] + medias[team2])
+                winner = self.play_ids(team1, team2)
+                winners.append(winner)
+                yield Match_event(number, stage, slot, team1, team2, probability, winner)
+            tournament = winners
+            stage += 1
+        self.store.cups[tournament[0]] += 1
+
+    def exact_odds(self, tournament, drift=True):
+        """
+        Compute exactly, without simulating, the chance of every team reaching every round
+
+        Parameters:
+        tournament (list): A list of Team objects in bracket order, None for a bye
+        drift (bool): Whether to include the media won by the winner of every match
+
+        Returns:
+        numpy.ndarray: A (teams, rounds + 1) matrix, one row per team in the order they
+        appear in tournament, where [team, r] is the probability of playing round r
+        and the last column is the probability of the title
+        """
+        # Imported here so that playing tournaments does not need NumPy
+        from exact_odds import Exact_odds
+
+        teams = [team for team in tournament if team is not None]
+        order, position = [], 0
+        for team in tournament:
+            order.append(-1 if team is None else position)
+            position += team is not None
+        return Exact_odds([team.media for team in teams], drift=drift, winner_bonus=self.winner_bonus).bracket(order)
+
     def play(self, team1, team2):
         """
         Simulate a match between two teams and determine the winner
@@ -76,12 +280,36 @@ class Tournament:
         # Select the winner based on media ratings
         winner = random.choices([team1, team2], weights=[team1.media, team2.media], k=1)[0]
 
-        # Find the correct instance of the winning team in self.teams
-        team = self.teams[self.teams.index(winner)]
-        
+        if self.instrumentation is not None:
+            self.instrumentation.match()
+
         # Increment the media of the winner and loser, then return the winner
-        team.media += 0.7
+        winner.media += self.winner_bonus
         loser = team1 if winner == team2 else team2
-        loser.media += 0.5
+        loser.media += self.loser_bonus
         
         return winner
+
+    def play_ids(self, team1, team2):
+        """
+        Simulate a match between two teams of self.store given by id
+
+        Parameters:
+        team1 (int): The id of the first team
+        team2 (int): The id of the second team
+
+        Returns:
+        int: The id of the winning team
+        """
+        store = self.store
+        medias = store.medias
+        winner = random.choices([team1, team2], weights=[medias[team1], medias[team2]], k=1)[0]
+
+        if self.instrumentation is not None:
+            self.instrumentation.match()
+
+        # Increment the media of the winner and loser by index, then return the winner
+        loser = team1 if winner == team2 else team2
+        store.set_media(winner, medias[winner] + self.winner_bonus)
+        store.set_media(loser, medias[loser] + self.loser_bonus)
+        return winner
@@ -1,5 +1,7 @@
 import random
-from team import Team
+from ranking import Ranking
+from swiss import Swiss
+from team import Team, Team_store
 from tournament import Tournament
 
 class Tournament_manager(Tournament):
@@ -9,26 +11,33 @@ class Tournament_manager(Tournament):
     """
     def __init__(self):
         """
-        Initializes the Tournament_manager with an empty list of teams
+        Initializes the Tournament_manager with an empty list of teams,
+        the store that holds their data, an index from lowercased name
+        to position in the list of teams and the ranking of the teams by media
         """
         self.teams = []
+        self.store = Team_store()
+        self.index = {}
+        self.ranking = Ranking(self.store)
 
-    def create_team(self, name, media):
+    def validate_team(self, name, media):
         """
-        Creates a new team and adds it to the list of teams if the name is valid and available
+        Validates the name and media of a team that is about to be created
 
         Args:
             name (str): The name of the team
             media (float): The media score of the team
 
         Returns:
-            True if the team is successfully created
+            float: The media converted to a number if the team is valid
             dict: Contains an error message if the team cannot be created
         """
         error = {'message': ''}
-        
+
         #We validate that the name is valid and available
-        if len(name) < 2 or not all(char.isalpha() or char.isspace() for char in name):
+        #Removing the whitespace leaves only the characters that must be letters
+        letters = ''.join(name.split())
+        if len(name) < 2 or (letters and not letters.isalpha()):
             error['message'] = f'Sorry, {name} is too short or contains invalid characters.'
             return error
         #Validate media
@@ -37,22 +46,99 @@ class Tournament_manager(Tournament):
         except ValueError:
             error['message']=f'{media} is not a valid number for media.'
             return error
-        
+
         # Check for duplicate team name
-        if any(team.name.lower() == name.lower() for team in self.teams):
+        if name.lower() in self.index:
             error['message'] = f'The name {name} already exists.'
             return error
-        
-        # Check for team limit
-        if len(self.teams) == 32:
-            error['message'] = f'limit reached'
-            return error
-        
+        return media
+
+    def add_team(self, name, media):
+        """
+        Adds an already validated team to the store, the list of teams and the index
+
+        Args:
+            name (str): The name of the team
+            media (float): The media score of the team
+        """
+        team = Team(name, media, self.store)
+        self.index[name.lower()] = len(self.teams)
+        self.teams.append(team)
+        self.ranking.add(team.id)
+
+    def add_teams(self, names, medias, cups=None, rank=True):
+        """
+        Adds many already validated teams at once, ranking them with a single sort
+
+        Args:
+            names (list): The names of the teams, not in use yet and unique among them
+            medias (sequence): The media score of every team
+            cups (sequence, optional): The cups already won by every team
+            rank (bool): Whether to rank them now; when adding in chunks, pass False and
+                give every id to ranking.add_many once at the end
+
+        Returns:
+            range: The ids of the new teams in the store
+        """
+        ids = self.store.extend(names, medias, cups)
+        start = len(self.teams)
+        self.teams.extend(self.store.team(team_id) for team_id in ids)
+        self.index.update((name.lower(), start + position) for position, name in enumerate(names))
+        if rank:
+            self.ranking.add_many(ids)
+        return ids
+
+    def create_team(self, name, media):
+        """
+        Creates a new team and adds it to the list of teams if the name is valid and available
+
+        Args:
+            name (str): The name of the team
+            media (float): The media score of the team
+
+        Returns:
+            True if the team is successfully created
+            dict: Contains an error message if the team cannot be created
+        """
+        media = self.validate_team(name, media)
+        if isinstance(media, dict):
+            return media
+
         #Create object of class Team and add to list
-        new_team = Team(name, media)
-        self.teams.append(new_team)
+        self.add_team(name, media)
         return True
 
+    def create_teams(self, teams):
+        """
+        Creates many teams at once, applying the same checks as create_team to each of them
+
+        Args:
+            teams (iterable): Pairs of (name, media)
+
+        Returns:
+            dict: 'created' with the number of teams added and 'errors' with a list of
+            (position, message) for every pair that was rejected
+        """
+        names = []
+        medias = []
+        errors = []
+        seen = set()
+        for position, (name, media) in enumerate(teams):
+            media = self.validate_team(name, media)
+            # A name repeated in the batch is a duplicate too, as if the first one was already added
+            if not isinstance(media, dict) and name.lower() in seen:
+                media = {'message': f'The name {name} already exists.'}
+            if isinstance(media, dict):
+                errors.append((position, media['message']))
+                continue
+            seen.add(name.lower())
+            names.append(name)
+            medias.append(media)
+        #Every valid team is added and ranked at once
+        if names:
+            self.add_teams(names, medias)
+        return {'created': len(names), 'errors': errors}
+
     def search_team(self, name):
         """
         Searches for a team by name in the list of teams
@@ -64,9 +150,9 @@ class Tournament_manager(Tournament):
             Team: The team object if found
             str: A message indicating that the team was not found
         """
-        #Traverse the list of teams, searching for that name 
-        team = next((team for team in self.teams if team.name.lower() == name.lower()), None)
-        return team if team else 'There is no team with that name'
+        #Look up the position of that name in the index
+        position = self.index.get(name.lower())
+        return self.teams[position] if position is not None else 'There is no team with that name'
 
     def delete_team(self, name):
         """
@@ -78,11 +164,16 @@ class Tournament_manager(Tournament):
         Returns:
             str: A message indicating whether the team was successfully deleted or not found
         """
-        team = next((team for team in self.teams if team.name.lower() == name.lower()), None)
-        if team:
-            self.teams.remove(team)
-            return 'Team deleted.'
-        return 'There is no team with that name.'
+        position = self.index.pop(name.lower(), None)
+        if position is None:
+            return 'There is no team with that name.'
+        self.ranking.remove(self.teams[position].id)
+        #Move the last team into the freed position so the removal does not shift the list
+        last = self.teams.pop()
+        if position < len(self.teams):
+            self.teams[position] = last
+            self.index[last.name.lower()] = position
+        return 'Team deleted.'
 
     def show_teams(self):
         """
@@ -96,23 +187,96 @@ class Tournament_manager(Tournament):
         if not self.teams:
             return 'There are no teams'
         
-        team_order = sorted(self.teams, key=lambda team: team.media, reverse=True)
-        return [f'{team.name}: {round(team.media, 2)} ({team.cup})' for team in team_order]
+        #The ranking is already in order, there is nothing to sort
+        return [self.format_team(team_id) for team_id in self.ranking]
+
+    def top_teams(self, start=0, count=10):
+        """
+        Returns one page of the teams, sorted by their average score in descending order
+
+        Args:
+            start (int): The position of the first team of the page, 0 for the leader
+            count (int): The number of teams of the page
+
+        Returns:
+            list: A list of strings representing the team names and their averages
+        """
+        return [self.format_team(team_id) for team_id in self.ranking.page(start, count)]
+
+    def format_team(self, team_id):
+        """
+        Formats a team for the leaderboard
+
+        Args:
+            team_id (int): The id of the team in the store
+
+        Returns:
+            str: The team name, its average and its cups
+        """
+        store = self.store
+        return f'{store.names[team_id]}: {round(store.medias[team_id], 2)} ({store.cups[team_id]})'
 
     def start_tournament(self):
         """
         Starts the tournament if the number of teams is valid
+        The teams are placed with the policy of self.seeding; by default, when the number
+        of teams is not a power of two, the teams with the highest media get byes
 
         Returns:
-            list: A list of games to be played in the tournament
+            list: A list of games to be played in the tournament, None in the place of a bye
             str: A message indicating that the tournament cannot be started due to an invalid number of teams
         """
         #Validate that there are enough teams in the list to start the tournament 
-        if len(self.teams) not in (4, 8, 16, 32):
-            return 'You can only create the tournament with 4, 8, 16 or 32 teams.'
-        #Reorganize the list random
-        random.shuffle(self.teams)
+        if len(self.teams) < 2:
+            return 'You need at least 2 teams to create the tournament.'
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start = instrumentation.clock()
+        #Reorganize a copy of the list random, the index keeps pointing to self.teams
+        teams = self.teams[:]
+        random.shuffle(teams)
         #Create an object of class Tournament and causes it to start 
-        tournament = Tournament(self.teams)
+        tournament = Tournament(self.seed(teams), self.store)
+        tournament.winner_bonus, tournament.loser_bonus = self.winner_bonus, self.loser_bonus
+        if instrumentation is not None:
+            instrumentation.count('tournaments')
+            instrumentation.add_time('start_tournament', start)
         return tournament.game()
 
+
+    def start_swiss(self):
+        """
+        Starts a Swiss-system event with every team, as an alternative to the elimination bracket
+
+        Returns:
+            Swiss: The event, ready to play its rounds with play_round or run
+            str: A message indicating that the event cannot be started due to an invalid number of teams
+        """
+        if len(self.teams) < 2:
+            return 'You need at least 2 teams to create the tournament.'
+        swiss = Swiss(self.teams[:], self.store)
+        swiss.winner_bonus, swiss.loser_bonus = self.winner_bonus, self.loser_bonus
+        return swiss
+
+    def simulate_events(self, tournaments):
+        """
+        Plays tournaments one after the other, yielding every match as it is played
+
+        Each tournament is drawn by start_tournament and changes the media and cups of the
+        teams like a tournament played from the interface. Memory does not grow with the
+        number of tournaments
+
+        Args:
+            tournaments (int): The number of tournaments to play
+
+        Returns:
+            generator: A Match_event per match, team ids refer to self.store
+
+        Raises:
+            ValueError: If the tournament cannot be started with the current teams
+        """
+        for number in range(tournaments):
+            bracket = self.start_tournament()
+            if isinstance(bracket, str):
+                raise ValueError(bracket)
+            yield from self.play_events([None if team is None else team.id for team in bracket], number)
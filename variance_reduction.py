@@ -0,0 +1,108 @@
+import numpy as np
+
+def reached(alive, team, stage):
+    """
+    Returns in which simulated brackets a team reached a round
+
+    Args:
+        alive (list): The arrays returned by Batch_tournament.simulate_chunk
+        team (int): The id of the team
+        stage (int): The round, len(alive) - 1 for the title
+
+    Returns:
+        numpy.ndarray: A float 0/1 value per bracket
+    """
+    return (alive[stage] == team).any(axis=1).astype(np.float64)
+
+def common_random_numbers(engine_a, engine_b, team, stage=None, brackets=100000, seed=None):
+    """
+    Estimates how a change of roster moves the chance of a team reaching a round
+
+    Both engines simulate every chunk from copies of the same random stream, so a
+    bracket only plays out differently where the change of media flips a match. The
+    difference then has far less variance than with two independent runs. Both
+    engines need the same number of teams
+
+    Args:
+        engine_a, engine_b (Batch_tournament): The engines of the two rosters
+        team (int): The id of the team
+        stage (int, optional): The round, counted from 0; the title when missing
+        brackets (int): The number of brackets simulated with each roster
+        seed (int, optional): Seed of the shared random stream
+
+    Returns:
+        dict: 'estimate_a', 'estimate_b', their 'difference' and its 'stderr', the number
+        of 'brackets' and 'ess', the number of independent pairs of brackets that
+        would give the same stderr
+    """
+    if len(engine_a.medias) != len(engine_b.medias):
+        raise ValueError('Common random numbers need two rosters with the same number of teams.')
+    stage = engine_a.rounds if stage is None else stage
+    rng = np.random.default_rng(seed)
+    sums = np.zeros(4)
+    done = 0
+    while done < brackets:
+        count = min(engine_a.chunk_size, brackets - done)
+        state = rng.bit_generator.state
+        a = reached(engine_a.simulate_chunk(count, rng), team, stage)
+        # Rewind the stream, so the second roster sees the very same draws
+        rng.bit_generator.state = state
+        b = reached(engine_b.simulate_chunk(count, rng), team, stage)
+        difference = a - b
+        sums += [a.sum(), b.sum(), difference.sum(), (difference * difference).sum()]
+        done += count
+
+    estimate_a, estimate_b, difference = sums[0] / done, sums[1] / done, sums[2] / done
+    variance = max(sums[3] / done - difference * difference, 0.0)
+    independent = estimate_a * (1 - estimate_a) + estimate_b * (1 - estimate_b)
+    ess = done * independent / variance if variance > 0 else float(done)
+    return {'estimate_a': float(estimate_a), 'estimate_b': float(estimate_b), 'difference': float(difference), 'stderr': float(variance / done) ** 0.5, 'brackets': done, 'ess': float(ess)}
+
+def importance_sampling(engine, team, stage=None, brackets=100000, floor=None, seed=None):
+    """
+    Estimates the chance of a long shot reaching a round by tilting its matches
+
+    In every match of the team up to the round, its chance of winning is raised to at
+    least floor and the bracket is reweighted by the likelihood ratio of the draws,
+    true probability over tilted probability, so the estimate stays unbiased. The other
+    matches and the media drift are untouched
+
+    Args:
+        engine (Batch_tournament): The engine of the roster
+        team (int): The id of the team
+        stage (int, optional): The round, counted from 0; the title when missing
+        brackets (int): The number of brackets to simulate
+        floor (float, optional): The smallest tilted chance of winning a match, by default
+            the one that would give the team even odds of reaching the round
+        seed (int, optional): Seed of the random stream
+
+    Returns:
+        dict: The 'estimate' and its 'stderr', the number of 'brackets' and 'ess',
+        the effective sample size (sum of weights)^2 / sum of squared weights
+    """
+    stage = engine.rounds if stage is None else stage
+    if floor is None:
+        floor = 0.5 ** (1 / max(stage, 1))
+    if not 0 < floor < 1:
+        raise ValueError(f'The floor must be between 0 and 1, got {floor}.')
+    def tilt(played, team1, team2, chance):
+        # Only the matches of the team before the round asked for are tilted
+        if played >= stage:
+            return chance
+        tilted = np.where(team1 == team, np.maximum(chance, floor), chance)
+        return np.where(team2 == team, np.minimum(chance, 1 - floor), tilted)
+
+    rng = np.random.default_rng(seed)
+    sums = np.zeros(4)
+    done = 0
+    while done < brackets:
+        count = min(engine.chunk_size, brackets - done)
+        weights = np.ones(count)
+        alive = engine.simulate_chunk(count, rng, tilt=tilt, weights=weights)
+        values = weights * reached(alive, team, stage)
+        sums += [values.sum(), (values * values).sum(), weights.sum(), (weights * weights).sum()]
+        done += count
+
+    estimate = sums[0] / done
+    variance = max(sums[1] / done - estimate * estimate, 0.0)
+    return {'estimate': float(estimate), 'stderr': float(variance / done) ** 0.5, 'brackets': done, 'ess': float(sums[2] ** 2 / sums[3])}